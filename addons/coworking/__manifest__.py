@@ -15,7 +15,7 @@ Long description of module's purpose
     # Check https://github.com/odoo/odoo/blob/15.0/odoo/addons/base/data/ir_module_category_data.xml
     # for the full list
     'category': 'Uncategorized',
-    'version': '0.1',
+    'version': '0.2',
 
     # any module necessary for this one to work correctly
     'depends': ['base',],
@@ -23,10 +23,20 @@ Long description of module's purpose
     # always loaded
    'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'views/coworking_customer_views.xml', # customer views
         'views/views.xml',           # types, amenities, spaces, bookings
         'views/library_views.xml',   # library items
         'views/coworking_calendar_views.xml',
+        'views/workspace_booking_series_views.xml',
+        'views/workspace_booking_archive_views.xml',
+        'views/workspace_waitlist_views.xml',
+        'views/workspace_booking_hold_views.xml',
+        'views/workspace_occupancy_report_views.xml',
+        'views/coworking_perf_stat_views.xml',
+        'wizard/workspace_booking_import_views.xml',
+        'wizard/coworking_export_views.xml',
+        'wizard/library_item_lending_views.xml',
         'views/menus.xml',
         'views/templates.xml',
     ],
@@ -1,22 +1,158 @@
 # -*- coding: utf-8 -*-
-# from odoo import http
+import hashlib
 
+from werkzeug.exceptions import BadRequest, NotFound
+from werkzeug.http import http_date
 
-# class Coworking(http.Controller):
-#     @http.route('/coworking/coworking', auth='public')
-#     def index(self, **kw):
-#         return "Hello, world"
+from odoo import api, fields, http
+from odoo.http import request
+from odoo.tools import consteq
+from odoo.tools.lru import LRU
 
-#     @http.route('/coworking/coworking/objects', auth='public')
-#     def list(self, **kw):
-#         return http.request.render('coworking.listing', {
-#             'root': '/coworking/coworking',
-#             'objects': http.request.env['coworking.coworking'].search([]),
-#         })
+from ..models.workspace_booking_ics import ics_parse_token, ics_token
 
-#     @http.route('/coworking/coworking/objects/<model("coworking.coworking"):obj>', auth='public')
-#     def object(self, obj, **kw):
-#         return http.request.render('coworking.object', {
-#             'object': obj
-#         })
+# Flux iCalendar déjà générés, par worker : une entrée n'est plus servie dès que
+# la version du flux (dernière modification / suppression) change
+_ics_cache = LRU(512)
 
+
+class Coworking(http.Controller):
+
+    @http.route('/coworking/spaces/available', type='json', auth='user')
+    def available_spaces(self, start_date, end_date, capacity=0, space_type_id=False, amenity_ids=None, limit=None, **kw):
+        """Espaces libres sur un créneau, du moins cher au plus cher"""
+        spaces = request.env['workspace.space'].search_available(
+            start_date, end_date,
+            capacity=capacity,
+            space_type_id=space_type_id,
+            amenity_ids=amenity_ids,
+            limit=limit,
+        )
+        return {'spaces': spaces}
+
+    @http.route('/coworking/holds/place', type='json', auth='user')
+    def place_hold(self, space_id, start_date, booking_type='hourly', duration_value=1.0, customer_id=False, **kw):
+        """Bloque un créneau le temps du paiement ; renvoie {'id', 'expires_at'}"""
+        return request.env['workspace.booking.hold'].place_hold(
+            int(space_id), start_date, booking_type, float(duration_value), customer_id,
+        )
+
+    @http.route('/coworking/holds/<int:hold_id>/promote', type='json', auth='user')
+    def promote_hold(self, hold_id, customer_id=False, notes=None, **kw):
+        """Transforme le blocage en réservation en attente"""
+        vals = {'notes': notes} if notes else {}
+        booking = request.env['workspace.booking.hold'].browse(hold_id).promote(customer_id, **vals)
+        return {'booking_id': booking.id, 'name': booking.name, 'total_price': booking.total_price}
+
+    @http.route('/coworking/holds/<int:hold_id>/release', type='json', auth='user')
+    def release_hold(self, hold_id, **kw):
+        """Libère le créneau avant l'échéance (panier abandonné)"""
+        request.env['workspace.booking.hold'].browse(hold_id).exists().action_release()
+        return {'released': True}
+
+    @http.route('/coworking/bookings/feed', type='http', auth='user', methods=['GET'])
+    def booking_feed(self, space_ids, start_date, end_date, **kw):
+        """Réservations d'un ou plusieurs espaces sur une fenêtre, pour calendriers et bornes
+
+        Les clients qui interrogent en boucle renvoient l'ETag reçu : tant que rien n'a
+        changé dans la fenêtre, on répond 304 après une seule requête d'agrégat.
+        """
+        Booking = request.env['workspace.booking']
+        try:
+            space_ids = sorted({int(space_id) for space_id in space_ids.split(',') if space_id.strip()})
+            start_date = fields.Datetime.to_datetime(start_date)
+            end_date = fields.Datetime.to_datetime(end_date)
+        except ValueError:
+            raise BadRequest("space_ids must be a comma-separated list of ids and dates 'YYYY-MM-DD HH:MM:SS'")
+        if not start_date or not end_date or start_date >= end_date:
+            raise BadRequest("end_date must be strictly after start_date")
+
+        last_write, count = Booking._feed_version(space_ids, start_date, end_date)
+        signature = f"{space_ids}|{start_date}|{end_date}|{last_write}|{count}"
+        etag = hashlib.sha1(signature.encode()).hexdigest()
+        headers = [('ETag', f'"{etag}"'), ('Cache-Control', 'private, no-cache')]
+        if last_write:
+            headers.append(('Last-Modified', http_date(last_write)))
+
+        if etag in request.httprequest.if_none_match:
+            return request.make_response('', headers=headers, status=304)
+
+        bookings = Booking._feed_read(space_ids, start_date, end_date)
+        for booking in bookings:
+            booking['start_date'] = fields.Datetime.to_string(booking['start_date'])
+            booking['end_date'] = fields.Datetime.to_string(booking['end_date'])
+        return request.make_json_response({'bookings': bookings}, headers=headers)
+
+    @http.route('/coworking/calendar/<any(space,customer):kind>/<int:record_id>.ics',
+                type='http', auth='public', methods=['GET'])
+    def calendar_feed(self, kind, record_id, token=None, sync_token=None, **kw):
+        """Flux iCalendar d'un espace ou d'un client, authentifié par son jeton d'abonnement
+
+        Avec sync_token (valeur X-COWORKING-SYNC-TOKEN du flux précédent), seules les
+        réservations modifiées et les suppressions depuis ce jeton sont renvoyées.
+        Tant que rien ne change, une requête d'index suffit : 304 sur ETag, sinon cache.
+        """
+        model = request.env['workspace.space' if kind == 'space' else 'coworking.customer'].sudo()
+        record = model.browse(record_id).exists()
+        if not record or not token or not consteq(record.calendar_token or '', token):
+            raise NotFound()
+
+        Booking = request.env['workspace.booking'].sudo()
+        field_name = model._calendar_feed_field
+        last_write, last_delete = Booking._ics_version(field_name, record_id)
+        since = ics_parse_token(sync_token)
+        # Le flux complet dépend aussi du jour (fenêtre des réservations passées)
+        key = (kind, record_id, since, last_write, last_delete, fields.Date.today())
+        etag = hashlib.sha1(repr(key).encode()).hexdigest()
+        new_token = ics_token(max(filter(None, (last_write, last_delete)), default=None))
+        headers = [
+            ('Content-Type', 'text/calendar; charset=utf-8'),
+            ('ETag', f'"{etag}"'),
+            ('Cache-Control', 'private, no-cache'),
+            ('X-Sync-Token', new_token),
+        ]
+        if etag in request.httprequest.if_none_match:
+            return request.make_response('', headers=headers, status=304)
+
+        body = _ics_cache.get(key)
+        if body is None:
+            bookings, tombstones = Booking._ics_changes(field_name, record_id, since)
+            body = Booking._ics_render(record.name, bookings, tombstones, new_token)
+            _ics_cache[key] = body
+        return request.make_response(body, headers=headers)
+
+    @http.route('/coworking/export/<any(bookings,library):kind>.<any(csv,xlsx):file_format>',
+                type='http', auth='user', methods=['GET'])
+    def export(self, kind, file_format, date_from=None, date_to=None, status=None, space_type_ids=None, **kw):
+        """Export CSV / XLSX envoyé au fil de la lecture d'un curseur serveur
+
+        Le générateur s'exécute après la fin de la requête : il ouvre son propre
+        curseur, avec les droits de l'utilisateur courant vérifiés ici.
+        """
+        request.env['workspace.booking' if kind == 'bookings' else 'library.item'].check_access_rights('read')
+        filters = {'statuses': [value for value in (status or '').split(',') if value]}
+        if kind == 'bookings':
+            filters.update(
+                date_from=date_from or None,
+                date_to=date_to or None,
+                space_type_ids={int(type_id) for type_id in (space_type_ids or '').split(',') if type_id.strip()},
+            )
+        registry, uid, context = request.env.registry, request.env.uid, dict(request.env.context)
+
+        def stream():
+            with registry.cursor() as cr:
+                Export = api.Environment(cr, uid, context)['coworking.export']
+                headers, rows = Export._rows(kind, **filters)
+                writer = Export._stream_xlsx if file_format == 'xlsx' else Export._stream_csv
+                yield from writer(headers, rows)
+
+        content_type = (
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' if file_format == 'xlsx'
+            else 'text/csv; charset=utf-8'
+        )
+        filename = f"{kind}_{fields.Date.to_string(fields.Date.today())}.{file_format}"
+        return request.make_response(stream(), headers=[
+            ('Content-Type', content_type),
+            ('Content-Disposition', f'attachment; filename="{filename}"'),
+            ('Cache-Control', 'no-store'),
+        ])
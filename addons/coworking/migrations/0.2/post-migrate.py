@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Reprend l'ancien champ Binary `photos` comme photo principale (image_1920)"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    cr.execute("""
+        SELECT id, res_id
+          FROM ir_attachment
+         WHERE res_model = 'workspace.space'
+           AND res_field = 'photos'
+           AND res_id IS NOT NULL
+    """)
+    for attachment_id, space_id in cr.fetchall():
+        attachment = env['ir.attachment'].browse(attachment_id)
+        space = env['workspace.space'].browse(space_id).exists()
+        if space and attachment.datas:
+            # Les miniatures sont générées ici, une seule fois
+            space.image_1920 = attachment.datas
+        attachment.unlink()
@@ -1,9 +1,21 @@
 # -*- coding: utf-8 -*-
 
+from . import coworking_perf_stat
+from . import coworking_calendar_feed
 from . import coworking_customer
 from . import workspace_types
 from . import workspace_amenities
 from . import workspace_spaces
 from . import workspace_space_amenities
+from . import workspace_space_images
 from . import workspace_bookings
+from . import workspace_booking_tombstone
+from . import workspace_booking_ics
+from . import workspace_booking_hold
+from . import workspace_booking_series
+from . import workspace_waitlist
+from . import workspace_booking_archive
 from . import library_items
+from . import library_item_moves
+from . import library_lending_report
+from . import workspace_occupancy_report
@@ -0,0 +1,48 @@
+import uuid
+
+from odoo import models, fields
+from odoo.tools import SQL
+
+
+class CoworkingCalendarFeedMixin(models.AbstractModel):
+    _name = 'coworking.calendar.feed.mixin'
+    _description = 'Calendar Feed Subscription'
+
+    # Route /coworking/calendar/<_calendar_route>/<id>.ics et colonne filtrée dans workspace_booking
+    _calendar_route = None
+    _calendar_feed_field = None
+
+    calendar_token = fields.Char(
+        string='Calendar Token', copy=False, groups='base.group_user',
+        default=lambda self: uuid.uuid4().hex,
+    )
+    calendar_url = fields.Char(string='Calendar Link', compute='_compute_calendar_url', groups='base.group_user')
+
+    def _auto_init(self):
+        res = super()._auto_init()
+        if self._abstract:
+            return res
+        # Enregistrements antérieurs au champ : un jeton propre à chacun, tiré comme le
+        # défaut (uuid4, source aléatoire du système) et non de random(), prévisible
+        self.env.cr.execute(SQL("SELECT id FROM %s WHERE calendar_token IS NULL", SQL.identifier(self._table)))
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        if ids:
+            self.env.cr.execute(SQL(
+                "UPDATE %s t SET calendar_token = n.token FROM unnest(%s::int[], %s::varchar[]) AS n(id, token)"
+                " WHERE t.id = n.id",
+                SQL.identifier(self._table), ids, [uuid.uuid4().hex for _id in ids],
+            ))
+        return res
+
+    def _compute_calendar_url(self):
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        for record in self:
+            record.calendar_url = record.id and (
+                f"{base_url}/coworking/calendar/{self._calendar_route}/{record.id}.ics"
+                f"?token={record.calendar_token}"
+            )
+
+    def action_regenerate_calendar_token(self):
+        """Révoque le lien d'abonnement actuel"""
+        for record in self:
+            record.calendar_token = uuid.uuid4().hex
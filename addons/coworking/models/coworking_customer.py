@@ -1,9 +1,14 @@
 from odoo import models, fields, api
 
+from .coworking_perf_stat import instrumented
+
 class CoworkingCustomer(models.Model):
     _name = 'coworking.customer'
     _description = 'Coworking Customer'
+    _inherit = ['coworking.calendar.feed.mixin']
     _order = 'name'
+    _calendar_route = 'customer'
+    _calendar_feed_field = 'customer_id'
 
     name = fields.Char(string='Name', required=True)
     email = fields.Char(string='Email')
@@ -15,11 +20,50 @@ class CoworkingCustomer(models.Model):
     
     # Relation avec les réservations
     booking_ids = fields.One2many('workspace.booking', 'customer_id', string='Bookings')
+    archived_booking_ids = fields.One2many('workspace.booking.archive', 'customer_id', string='Archived Bookings')
     
-    # Pour compter les réservations
-    booking_count = fields.Integer(string='Booking Count', compute='_compute_booking_count')
-    
-    @api.depends('booking_ids')
-    def _compute_booking_count(self):
+    # Statistiques de réservation, stockées et recalculées uniquement pour les clients concernés
+    booking_count = fields.Integer(string='Booking Count', compute='_compute_booking_stats', store=True)
+    active_booking_count = fields.Integer(string='Active Bookings', compute='_compute_booking_stats', store=True)
+    total_spent = fields.Float(string='Total Spent', digits=(16, 2), compute='_compute_booking_stats', store=True)
+    last_booking_date = fields.Datetime(string='Last Booking', compute='_compute_booking_stats', store=True)
+
+    @api.depends('booking_ids', 'booking_ids.status', 'booking_ids.total_price', 'booking_ids.start_date')
+    @instrumented
+    def _compute_booking_stats(self):
+        """Agrège les réservations de tout le lot, archive comprise, en un read_group par table"""
+        stats = {customer.id: {
+            'booking_count': 0,
+            'active_booking_count': 0,
+            'total_spent': 0.0,
+            'last_booking_date': False,
+        } for customer in self}
+        customer_ids = [customer_id for customer_id in self.ids if customer_id]
+        groups = []
+        if customer_ids:
+            for model in ('workspace.booking', 'workspace.booking.archive'):
+                groups += self.env[model]._read_group(
+                    [('customer_id', 'in', customer_ids)],
+                    ['customer_id', 'status'],
+                    ['__count', 'total_price:sum', 'start_date:max'],
+                )
+            for customer, status, count, total_price, start_date in groups:
+                values = stats[customer.id]
+                values['booking_count'] += count
+                if status == 'cancelled':
+                    continue
+                if status in ('pending', 'confirmed'):
+                    values['active_booking_count'] += count
+                values['total_spent'] += total_price or 0.0
+                if start_date and (not values['last_booking_date'] or start_date > values['last_booking_date']):
+                    values['last_booking_date'] = start_date
         for customer in self:
-            customer.booking_count = len(customer.booking_ids)
\ No newline at end of file
+            customer.update(stats[customer.id])
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'name' in vals:
+            self.env['workspace.booking']._propagate_names('customer_id', self.ids)
+            series = self.env['workspace.booking.series'].search([('customer_id', 'in', self.ids)])
+            self.env.add_to_compute(series._fields['name'], series)
+        return res
@@ -0,0 +1,167 @@
+import functools
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+
+from odoo import models, fields, api, tools
+
+_logger = logging.getLogger(__name__)
+
+# Paramètre système : taux d'échantillonnage entre 0 (désactivé) et 1 (tous les appels)
+SAMPLE_RATE_PARAM = 'coworking.instrumentation_sample_rate'
+# Délai minimal entre deux écritures du tampon en base, par processus
+FLUSH_INTERVAL = 30
+
+# Tampon par processus : (modèle, méthode) -> [appels, enregistrements, requêtes, secondes, max secondes]
+_buffer = defaultdict(lambda: [0, 0, 0, 0.0, 0.0])
+_buffer_lock = threading.Lock()
+_last_flush = [time.monotonic()]
+# Minuteur qui envoie le tampon en fin d'intervalle quand plus aucune mesure n'arrive
+_flush_timer = [None]
+
+
+def _flush_pending(registry):
+    """Vide le tampon du processus et l'envoie en base"""
+    with _buffer_lock:
+        pending = dict(_buffer)
+        _buffer.clear()
+        _last_flush[0] = time.monotonic()
+    _write_pending(registry, pending)
+
+
+def _write_pending(registry, pending):
+    """Cumule le tampon dans la table, sur un curseur à part pour survivre aux rollbacks"""
+    rows = [
+        (model_name, method, calls, records, queries, seconds * 1000, max_seconds * 1000)
+        for (model_name, method), (calls, records, queries, seconds, max_seconds) in pending.items()
+    ]
+    if not rows:
+        return
+    try:
+        with registry.cursor() as cr:
+            cr.execute("""
+                INSERT INTO coworking_perf_stat AS s
+                       (model_name, method, calls, records, queries, total_ms, max_ms,
+                        avg_ms, avg_queries, last_update)
+                SELECT t.model_name, t.method, t.calls, t.records, t.queries, t.total_ms, t.max_ms,
+                       t.total_ms / t.calls, t.queries::float / t.calls, now() at time zone 'UTC'
+                  FROM unnest(%s::varchar[], %s::varchar[], %s::int[], %s::int[], %s::int[],
+                              %s::float[], %s::float[])
+                       AS t(model_name, method, calls, records, queries, total_ms, max_ms)
+                ON CONFLICT (model_name, method) DO UPDATE
+                   SET calls = s.calls + EXCLUDED.calls,
+                       records = s.records + EXCLUDED.records,
+                       queries = s.queries + EXCLUDED.queries,
+                       total_ms = s.total_ms + EXCLUDED.total_ms,
+                       max_ms = GREATEST(s.max_ms, EXCLUDED.max_ms),
+                       avg_ms = (s.total_ms + EXCLUDED.total_ms) / (s.calls + EXCLUDED.calls),
+                       avg_queries = (s.queries + EXCLUDED.queries)::float / (s.calls + EXCLUDED.calls),
+                       last_update = EXCLUDED.last_update
+            """, [list(column) for column in zip(*rows)])
+    except Exception:
+        _logger.warning("Unable to store coworking performance statistics", exc_info=True)
+
+
+def instrumented(method):
+    """Mesure appels, requêtes SQL et durée d'une méthode de modèle
+
+    Désactivé, le surcoût se limite à la lecture du taux en cache (ormcache).
+    À placer au plus près de la fonction, sous @api.depends / @api.constrains.
+    """
+    method_name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        Stat = self.env['coworking.perf.stat']
+        rate = Stat._sample_rate()
+        if not rate or (rate < 1 and random.random() >= rate):
+            return method(self, *args, **kwargs)
+        cr = self.env.cr
+        queries = cr.sql_log_count
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            Stat._record(self._name, method_name, len(self), cr.sql_log_count - queries,
+                         time.perf_counter() - started)
+    return wrapper
+
+
+class CoworkingPerfStat(models.Model):
+    _name = 'coworking.perf.stat'
+    _description = 'Coworking Performance Statistic'
+    _order = 'total_ms desc'
+    _rec_name = 'method'
+    _sql_constraints = [
+        ('model_method_uniq', 'unique(model_name, method)', 'One statistic line per model method.'),
+    ]
+
+    model_name = fields.Char(string='Model', required=True, readonly=True)
+    method = fields.Char(string='Method', required=True, readonly=True)
+    calls = fields.Integer(string='Sampled Calls', readonly=True)
+    records = fields.Integer(string='Records', readonly=True)
+    queries = fields.Integer(string='SQL Queries', readonly=True)
+    total_ms = fields.Float(string='Total (ms)', digits=(16, 2), readonly=True)
+    max_ms = fields.Float(string='Max (ms)', digits=(16, 2), readonly=True)
+    avg_ms = fields.Float(string='Average (ms)', digits=(16, 2), readonly=True)
+    avg_queries = fields.Float(string='Queries / Call', digits=(16, 2), readonly=True)
+    last_update = fields.Datetime(string='Last Update', readonly=True)
+
+    @api.model
+    @tools.ormcache()
+    def _sample_rate(self):
+        try:
+            rate = float(self.env['ir.config_parameter'].sudo().get_param(SAMPLE_RATE_PARAM, 0))
+        except ValueError:
+            return 0.0
+        return min(max(rate, 0.0), 1.0)
+
+    @api.model
+    def _record(self, model_name, method, records, queries, seconds):
+        """Ajoute une mesure au tampon et l'envoie en base au plus toutes les FLUSH_INTERVAL secondes
+
+        Une mesure qui arrive avant l'échéance arme un minuteur : le tampon part en
+        base à la fin de l'intervalle même si le processus ne reçoit plus d'appels.
+        """
+        _logger.debug(json.dumps({
+            'model': model_name, 'method': method, 'records': records,
+            'queries': queries, 'ms': round(seconds * 1000, 3),
+        }))
+        with _buffer_lock:
+            stat = _buffer[(model_name, method)]
+            stat[0] += 1
+            stat[1] += records
+            stat[2] += queries
+            stat[3] += seconds
+            stat[4] = max(stat[4], seconds)
+            if time.monotonic() - _last_flush[0] < FLUSH_INTERVAL:
+                # Un minuteur hérité d'un fork n'a pas de thread vivant : il est réarmé
+                timer = _flush_timer[0]
+                if not (timer and timer.is_alive()):
+                    timer = _flush_timer[0] = threading.Timer(FLUSH_INTERVAL, _flush_pending, [self.env.registry])
+                    timer.daemon = True
+                    timer.start()
+                return
+            pending = dict(_buffer)
+            _buffer.clear()
+            _last_flush[0] = time.monotonic()
+        _write_pending(self.env.registry, pending)
+
+    @api.model
+    def action_slowest_operations(self):
+        """Opérations instrumentées, de la plus lente à la plus rapide en moyenne"""
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Slowest Operations',
+            'res_model': self._name,
+            'view_mode': 'tree',
+            'views': [(self.env.ref('coworking.view_coworking_perf_stat_slowest_tree').id, 'tree')],
+            'target': 'current',
+        }
+
+    def action_reset(self):
+        """Remet les statistiques à zéro"""
+        self.search([]).unlink()
@@ -1,5 +1,27 @@
 from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+from odoo.exceptions import UserError, ValidationError
+
+# Même règle que _compute_status, évaluée par PostgreSQL sur la ligne mise à jour
+STATUS_SQL = """
+    CASE
+        WHEN i.condition = 'maintenance' THEN 'maintenance'
+        WHEN i.available_quantity + m.delta <= 0 THEN 'unavailable'
+        WHEN i.available_quantity + m.delta <= i.total_quantity * 0.5 THEN 'limited'
+        ELSE 'available'
+    END
+"""
+
+CATEGORIES = [
+    ('monitor', 'Monitor'),
+    ('cable', 'Cable'),
+    ('keyboard', 'Keyboard'),
+    ('mouse', 'Mouse'),
+    ('charger', 'Charger'),
+    ('webcam', 'Webcam')
+]
+
+# Sens imposé des variations par type de mouvement (les ajustements vont dans les deux sens)
+MOVE_SIGNS = {'checkout': -1, 'return': 1, 'maintenance_out': -1, 'maintenance_in': 1}
 
 class LibraryItem(models.Model):
     _name = 'library.item'
@@ -7,14 +29,7 @@ class LibraryItem(models.Model):
     _order = 'name'
 
     name = fields.Char(string='Name', required=True)
-    category = fields.Selection([
-        ('monitor', 'Monitor'),
-        ('cable', 'Cable'),
-        ('keyboard', 'Keyboard'),
-        ('mouse', 'Mouse'),
-        ('charger', 'Charger'),
-        ('webcam', 'Webcam')
-    ], string='Category', required=True)
+    category = fields.Selection(CATEGORIES, string='Category', required=True)
     condition = fields.Selection([
         ('new', 'New'),
         ('good', 'Good'),
@@ -33,6 +48,7 @@ class LibraryItem(models.Model):
     ], string='Status', compute='_compute_status', store=True)
 
     notes = fields.Text(string='Notes')
+    move_ids = fields.One2many('library.item.move', 'item_id', string='Movements')
 
     @api.depends('available_quantity', 'total_quantity', 'condition')
     def _compute_status(self):
@@ -206,4 +222,142 @@ class LibraryItem(models.Model):
                 'sticky': False,
                 'type': 'info',
             }
-        }
\ No newline at end of file
+        }
+
+    @api.model
+    def _move_quantities(self, deltas, move_type='adjustment', customer_id=False, note=False):
+        """Applique atomiquement des variations de stock {item_id: delta}
+
+        Un seul UPDATE conditionnel : une ligne n'est modifiée que si la nouvelle
+        quantité reste entre 0 et la quantité totale (et hors maintenance pour un
+        prêt). Le mouvement correspondant est inscrit au registre dans la même
+        instruction. Si un article ne peut pas suivre, rien n'est appliqué.
+        Renvoie {item_id: nouvelle quantité disponible}.
+        """
+        # Les clés arrivent en texte par JSON-RPC
+        deltas = {int(item_id): int(delta) for item_id, delta in deltas.items() if delta}
+        if not deltas:
+            return {}
+        sign = MOVE_SIGNS.get(move_type)
+        if sign and any(delta * sign < 0 for delta in deltas.values()):
+            raise UserError(f" Quantity sign does not match a {move_type} move.")
+        self.check_access_rights('write')
+        self.flush_model(['available_quantity', 'total_quantity', 'condition'])
+        item_ids, values = zip(*deltas.items())
+        with self.env.cr.savepoint(flush=False):
+            self.env.cr.execute(f"""
+                WITH updated AS (
+                    UPDATE library_item i
+                       SET available_quantity = i.available_quantity + m.delta,
+                           status = {STATUS_SQL},
+                           write_uid = %(uid)s,
+                           write_date = (now() at time zone 'UTC')
+                      FROM unnest(%(item_ids)s::int[], %(deltas)s::int[]) AS m(id, delta)
+                     WHERE i.id = m.id
+                       AND i.available_quantity + m.delta BETWEEN 0 AND i.total_quantity
+                       AND (%(move_type)s != 'checkout' OR i.condition IS DISTINCT FROM 'maintenance')
+                 RETURNING i.id, m.delta, i.available_quantity
+                )
+                INSERT INTO library_item_move
+                       (item_id, move_type, quantity, delta, balance, customer_id, note, date,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT u.id, %(move_type)s, abs(u.delta), u.delta, u.available_quantity, %(customer_id)s, %(note)s,
+                       now() at time zone 'UTC',
+                       %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                  FROM updated u
+             RETURNING item_id, balance
+            """, {
+                'uid': self.env.uid,
+                'item_ids': list(item_ids),
+                'deltas': list(values),
+                'move_type': move_type,
+                'customer_id': customer_id or None,
+                'note': note or None,
+            })
+            quantities = dict(self.env.cr.fetchall())
+            missing = self.browse([item_id for item_id in item_ids if item_id not in quantities])
+            if missing:
+                raise ValidationError(
+                    " Not enough stock for: " + ", ".join(missing.mapped('name')) + "."
+                )
+        self.browse(quantities).invalidate_recordset(['available_quantity', 'status', 'write_uid', 'write_date'])
+        self.env['library.item.move'].invalidate_model()
+        return quantities
+
+    @api.model
+    def _positive_quantities(self, quantities):
+        """{item_id: quantité} en entiers, chaque quantité strictement positive"""
+        quantities = {int(item_id): int(qty) for item_id, qty in quantities.items()}
+        if any(qty <= 0 for qty in quantities.values()):
+            raise UserError(" Quantity must be greater than 0.")
+        return quantities
+
+    @api.model
+    def checkout_items(self, quantities, customer_id=False):
+        """Prête plusieurs articles en un appel : {item_id: quantité}"""
+        quantities = self._positive_quantities(quantities)
+        return self._move_quantities(
+            {item_id: -qty for item_id, qty in quantities.items()}, 'checkout', customer_id,
+        )
+
+    @api.model
+    def return_items(self, quantities, customer_id=False):
+        """Retourne plusieurs articles en un appel : {item_id: quantité}"""
+        return self._move_quantities(self._positive_quantities(quantities), 'return', customer_id)
+
+    @api.model
+    def maintenance_items(self, quantities, back=False):
+        """Sort (ou réintègre avec back=True) des exemplaires pour maintenance"""
+        quantities = self._positive_quantities(quantities)
+        if back:
+            return self._move_quantities(quantities, 'maintenance_in')
+        return self._move_quantities({item_id: -qty for item_id, qty in quantities.items()}, 'maintenance_out')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        items = super().create(vals_list)
+        # Le stock initial est le premier mouvement du registre, en lecture seule pour les utilisateurs
+        self.env['library.item.move'].sudo().create([{
+            'item_id': item.id,
+            'move_type': 'adjustment',
+            'quantity': abs(item.available_quantity),
+            'delta': item.available_quantity,
+            'balance': item.available_quantity,
+            'note': 'Initial stock',
+        } for item in items if item.available_quantity])
+        return items
+
+    def write(self, vals):
+        if 'available_quantity' not in vals:
+            return super().write(vals)
+        previous = {item.id: item.available_quantity for item in self}
+        res = super().write(vals)
+        # Une saisie manuelle de la quantité disponible devient un ajustement tracé
+        self.env['library.item.move'].sudo().create([{
+            'item_id': item.id,
+            'move_type': 'adjustment',
+            'quantity': abs(item.available_quantity - previous[item.id]),
+            'delta': item.available_quantity - previous[item.id],
+            'balance': item.available_quantity,
+            'note': 'Manual adjustment',
+        } for item in self if item.available_quantity != previous[item.id]])
+        return res
+
+    def _open_lending(self, move_type):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Check Out' if move_type == 'checkout' else 'Return',
+            'res_model': 'library.item.lending',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {'default_item_id': self.id, 'default_move_type': move_type},
+        }
+
+    def action_checkout(self):
+        """Prête des exemplaires : l'assistant demande le client emprunteur"""
+        return self._open_lending('checkout')
+
+    def action_return(self):
+        """Enregistre un retour : l'assistant demande le client qui rend"""
+        return self._open_lending('return')
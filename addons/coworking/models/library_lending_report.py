@@ -0,0 +1,56 @@
+from odoo import models, fields, tools
+
+from .library_items import CATEGORIES
+
+
+class LibraryLendingReport(models.Model):
+    _name = 'library.lending.report'
+    _description = 'Library Lending Report'
+    _auto = False
+    _order = 'outstanding_quantity desc, lent_quantity desc'
+
+    customer_id = fields.Many2one('coworking.customer', string='Customer', readonly=True)
+    item_id = fields.Many2one('library.item', string='Item', readonly=True)
+    category = fields.Selection(CATEGORIES, string='Category', readonly=True)
+    lent_quantity = fields.Integer(string='Lent', readonly=True)
+    returned_quantity = fields.Integer(string='Returned', readonly=True)
+    outstanding_quantity = fields.Integer(string='Outstanding', readonly=True)
+    avg_lend_hours = fields.Float(string='Avg. Lend Duration (h)', group_operator='avg', readonly=True)
+    last_checkout_date = fields.Datetime(string='Last Checkout', readonly=True)
+
+    def init(self):
+        # Durée moyenne sans appariement prêt/retour : chaque exemplaire rendu compte
+        # (date de retour - date de prêt), chaque exemplaire encore dehors (now - date de prêt)
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE VIEW library_lending_report AS (
+                SELECT a.id,
+                       a.customer_id,
+                       a.item_id,
+                       i.category,
+                       a.lent AS lent_quantity,
+                       a.returned AS returned_quantity,
+                       GREATEST(a.lent - a.returned, 0) AS outstanding_quantity,
+                       (a.returned_epochs
+                        + GREATEST(a.lent - a.returned, 0) * EXTRACT(EPOCH FROM now() at time zone 'UTC')
+                        - a.lent_epochs) / NULLIF(a.lent, 0) / 3600 AS avg_lend_hours,
+                       a.last_checkout_date
+                  FROM (
+                        SELECT min(m.id) AS id,
+                               m.customer_id,
+                               m.item_id,
+                               COALESCE(sum(m.quantity) FILTER (WHERE m.move_type = 'checkout'), 0) AS lent,
+                               COALESCE(sum(m.quantity) FILTER (WHERE m.move_type = 'return'), 0) AS returned,
+                               COALESCE(sum(EXTRACT(EPOCH FROM m.date) * m.quantity)
+                                        FILTER (WHERE m.move_type = 'checkout'), 0) AS lent_epochs,
+                               COALESCE(sum(EXTRACT(EPOCH FROM m.date) * m.quantity)
+                                        FILTER (WHERE m.move_type = 'return'), 0) AS returned_epochs,
+                               max(m.date) FILTER (WHERE m.move_type = 'checkout') AS last_checkout_date
+                          FROM library_item_move m
+                         WHERE m.customer_id IS NOT NULL
+                           AND m.move_type IN ('checkout', 'return')
+                         GROUP BY m.customer_id, m.item_id
+                       ) a
+                  JOIN library_item i ON i.id = a.item_id
+            )
+        """)
@@ -6,4 +6,13 @@ class WorkspaceAmenity(models.Model):
     _order = 'name'
 
     name = fields.Char(string='Name', required=True)
-    icon = fields.Char(string='Icon', help='Font Awesome icon class')
\ No newline at end of file
+    icon = fields.Char(string='Icon', help='Font Awesome icon class')
+
+    def unlink(self):
+        self.env.cr.execute(
+            "SELECT id FROM workspace_space WHERE amenity_signature && %s::int[]", [self.ids]
+        )
+        spaces = self.env['workspace.space'].browse([row[0] for row in self.env.cr.fetchall()])
+        res = super().unlink()
+        spaces._update_amenity_signature()
+        return res
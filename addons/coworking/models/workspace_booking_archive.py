@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from odoo import models, fields, api, tools
+
+_logger = logging.getLogger(__name__)
+
+# Horizon par défaut (en jours) au-delà duquel une réservation terminée est archivée
+DEFAULT_ARCHIVE_DAYS = 180
+ARCHIVE_BATCH_SIZE = 5000
+
+# Colonnes recopiées telles quelles de workspace_booking vers l'archive
+ARCHIVED_COLUMNS = [
+    'name', 'space_id', 'customer_id', 'booking_type', 'duration_value', 'start_date', 'end_date',
+    'total_price', 'status', 'notes', 'series_id', 'created_date',
+    'create_uid', 'create_date', 'write_uid', 'write_date',
+]
+
+
+class WorkspaceBookingArchive(models.Model):
+    _name = 'workspace.booking.archive'
+    _description = 'Archived Workspace Booking'
+    _order = 'start_date desc'
+
+    booking_id = fields.Integer(string='Original Booking ID', readonly=True)
+    name = fields.Char(string='Name', readonly=True)
+    space_id = fields.Many2one('workspace.space', string='Space', readonly=True, index=True)
+    customer_id = fields.Many2one('coworking.customer', string='Customer', readonly=True, index=True)
+    booking_type = fields.Selection([
+        ('hourly', 'Hourly'),
+        ('daily', 'Daily'),
+        ('monthly', 'Monthly')
+    ], string='Booking Type', readonly=True)
+    duration_value = fields.Float(string='Duration', readonly=True)
+    start_date = fields.Datetime(string='Start Date', readonly=True, index=True)
+    end_date = fields.Datetime(string='End Date', readonly=True)
+    total_price = fields.Float(string='Total Price', readonly=True)
+    status = fields.Selection([
+        ('cancelled', 'Cancelled'),
+        ('completed', 'Completed')
+    ], string='Status', readonly=True)
+    notes = fields.Text(string='Notes', readonly=True)
+    series_id = fields.Many2one('workspace.booking.series', string='Recurring Series', readonly=True, ondelete='set null')
+    created_date = fields.Datetime(string='Created Date', readonly=True)
+    archived_date = fields.Datetime(string='Archived On', readonly=True)
+
+    def init(self):
+        # Rafraîchissement du rapport d'occupation sur des jours anciens
+        tools.create_index(
+            self.env.cr, 'workspace_booking_archive_space_dates_idx', self._table,
+            ['space_id', 'start_date', 'end_date'],
+        )
+
+    @api.model
+    def _archive_batch(self, horizon, batch_size):
+        """Déplace un lot de réservations terminées ou annulées en une seule instruction
+
+        DELETE ... RETURNING alimente directement l'INSERT : les lignes quittent la
+        table chaude et arrivent dans l'archive dans la même transaction. Une trace
+        de suppression est inscrite pour chacune : les flux iCalendar incrémentaux
+        retirent l'événement, comme le flux complet qui ne lit pas l'archive.
+        """
+        columns = ', '.join(ARCHIVED_COLUMNS)
+        self.env.cr.execute(f"""
+            WITH moved AS (
+                DELETE FROM workspace_booking
+                 WHERE id IN (
+                       SELECT id
+                         FROM workspace_booking
+                        WHERE status IN ('completed', 'cancelled')
+                          AND end_date < %(horizon)s
+                        LIMIT %(limit)s
+                          FOR UPDATE SKIP LOCKED
+                 )
+             RETURNING id, {columns}
+            ), archived AS (
+                INSERT INTO workspace_booking_archive (booking_id, {columns}, archived_date)
+                SELECT id, {columns}, now() at time zone 'UTC'
+                  FROM moved
+            ), tombstones AS (
+                INSERT INTO workspace_booking_tombstone
+                       (booking_id, space_id, customer_id, start_date, end_date, deleted_date,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT id, space_id, customer_id, start_date, end_date, now() at time zone 'UTC',
+                       %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                  FROM moved
+            )
+            SELECT count(*) FROM moved
+        """, {'horizon': horizon, 'limit': batch_size, 'uid': self.env.uid})
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _cron_archive(self, batch_size=ARCHIVE_BATCH_SIZE):
+        """Archive par lots les réservations plus anciennes que l'horizon configuré
+
+        Les statistiques clients comptent aussi l'archive : elles restent inchangées.
+        """
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'coworking.booking_archive_days', DEFAULT_ARCHIVE_DAYS,
+        ))
+        horizon = fields.Datetime.now() - timedelta(days=days)
+        self.env['workspace.booking'].flush_model()
+        started = time.monotonic()
+        total = 0
+        while True:
+            moved = self._archive_batch(horizon, batch_size)
+            total += moved
+            if auto_commit:
+                self.env.cr.commit()
+            if moved < batch_size:
+                break
+        self.env['workspace.booking'].invalidate_model()
+        self.env['workspace.booking.tombstone'].invalidate_model()
+        _logger.info("Booking archive: %s booking(s) archived in %.2fs", total, time.monotonic() - started)
@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+
+from psycopg2 import errors
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import AccessError, ValidationError
+
+from .workspace_bookings import booking_end_date, booking_dates_error, booking_duration_error
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_HOLD_TTL_MINUTES = 10
+HOLD_SWEEP_BATCH_SIZE = 10000
+
+
+class WorkspaceBookingHold(models.Model):
+    _name = 'workspace.booking.hold'
+    _description = 'Temporary Booking Hold'
+    _order = 'expires_at'
+    # Garantie en base : deux transactions concurrentes ne peuvent pas bloquer le même
+    # créneau, même si aucune ne voit le blocage de l'autre dans son instantané
+    _sql_constraints = [
+        ('space_period_no_overlap',
+         "EXCLUDE USING gist (space_id WITH =, tsrange(start_date, end_date) WITH &&)",
+         "This space is already held for this period."),
+    ]
+
+    space_id = fields.Many2one('workspace.space', string='Space', required=True, readonly=True, ondelete='cascade')
+    customer_id = fields.Many2one('coworking.customer', string='Customer', readonly=True, ondelete='cascade')
+    booking_type = fields.Selection([
+        ('hourly', 'Hourly'),
+        ('daily', 'Daily'),
+        ('monthly', 'Monthly')
+    ], string='Booking Type', required=True, readonly=True)
+    duration_value = fields.Float(string='Duration', required=True, readonly=True)
+    start_date = fields.Datetime(string='Start Date', required=True, readonly=True)
+    end_date = fields.Datetime(string='End Date', required=True, readonly=True)
+    # Un blocage dont l'échéance est passée est ignoré partout : aucune écriture
+    # n'est nécessaire pour l'expirer. Le balayage, ou un nouveau blocage sur le
+    # même créneau, le supprime
+    expires_at = fields.Datetime(string='Expires At', required=True, readonly=True, index=True)
+
+    def _auto_init(self):
+        self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        # Les blocages échus chevauchent parfois un blocage actif : les retirer avant
+        # de poser la contrainte d'exclusion
+        if tools.table_exists(self.env.cr, self._table):
+            self.env.cr.execute("DELETE FROM workspace_booking_hold WHERE expires_at <= (now() at time zone 'UTC')")
+        return super()._auto_init()
+
+    def init(self):
+        # Remplacé par l'index de la contrainte d'exclusion
+        self.env.cr.execute("DROP INDEX IF EXISTS workspace_booking_hold_space_period_idx")
+
+    @api.model
+    def _ttl_minutes(self):
+        return float(self.env['ir.config_parameter'].sudo().get_param(
+            'coworking.booking_hold_ttl_minutes', DEFAULT_HOLD_TTL_MINUTES,
+        ))
+
+    @api.model
+    def place_hold(self, space_id, start_date, booking_type='hourly', duration_value=1.0, customer_id=False):
+        """Bloque un créneau pour la durée du paiement en ligne
+
+        Les blocages échus qui chevauchent le créneau sont supprimés, puis un
+        INSERT ... SELECT vérifie l'absence de réservation et crée le blocage. La
+        contrainte d'exclusion refuse un blocage concurrent, validé ou non, que
+        l'instantané de la transaction ne montre pas. Renvoie {'id', 'expires_at'}.
+        """
+        self.check_access_rights('create')
+        start_date = fields.Datetime.to_datetime(start_date)
+        end_date = booking_end_date(booking_type, start_date, duration_value)
+        error = booking_dates_error(start_date, end_date) or booking_duration_error(booking_type, duration_value)
+        if error:
+            raise ValidationError(error)
+        Booking = self.env['workspace.booking']
+        Booking.flush_model(['space_id', 'start_date', 'end_date', 'status'])
+        Booking._lock_spaces([space_id])
+        params = {
+            'space_id': space_id,
+            'customer_id': customer_id or None,
+            'booking_type': booking_type,
+            'duration_value': duration_value,
+            'start': start_date,
+            'end': end_date,
+            'ttl': self._ttl_minutes() * 60,
+            'uid': self.env.uid,
+        }
+        self.env.cr.execute("""
+            DELETE FROM workspace_booking_hold
+             WHERE space_id = %(space_id)s
+               AND expires_at <= (now() at time zone 'UTC')
+               AND tsrange(start_date, end_date) && tsrange(%(start)s, %(end)s)
+        """, params)
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute("""
+                    INSERT INTO workspace_booking_hold
+                           (space_id, customer_id, booking_type, duration_value, start_date, end_date, expires_at,
+                            create_uid, create_date, write_uid, write_date)
+                    SELECT %(space_id)s, %(customer_id)s, %(booking_type)s, %(duration_value)s, %(start)s, %(end)s,
+                           (now() at time zone 'UTC') + make_interval(secs => %(ttl)s),
+                           %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                     WHERE NOT EXISTS (
+                           SELECT 1
+                             FROM workspace_booking b
+                            WHERE b.space_id = %(space_id)s
+                              AND b.status IS DISTINCT FROM 'cancelled'
+                              AND b.end_date > b.start_date
+                              AND tsrange(b.start_date, b.end_date) && tsrange(%(start)s, %(end)s)
+                     )
+                 RETURNING id, expires_at
+                """, params, log_exceptions=False)
+                row = self.env.cr.fetchone()
+        except errors.ExclusionViolation:
+            row = None
+        if not row:
+            raise ValidationError(" This space is already booked or held for this period.")
+        return {'id': row[0], 'expires_at': fields.Datetime.to_string(row[1])}
+
+    def promote(self, customer_id=False, **vals):
+        """Transforme le blocage en réservation en attente, en un appel
+
+        Seule la session qui a posé le blocage peut le promouvoir, et la réservation
+        revient au client du blocage s'il en a un. Le blocage est supprimé puis la
+        réservation créée dans la même transaction. Un blocage expiré, ou déjà
+        supprimé par le balayage, ne peut plus être promu.
+        """
+        self.ensure_one()
+        self.env.cr.execute("""
+            SELECT create_uid, customer_id
+              FROM workspace_booking_hold
+             WHERE id = %s
+               AND expires_at > (now() at time zone 'UTC')
+               FOR UPDATE
+        """, [self.id])
+        row = self.env.cr.fetchone()
+        if not row:
+            raise ValidationError(" This hold has expired, please choose the slot again.")
+        owner_id, hold_customer_id = row
+        if owner_id != self.env.uid and not self.env.su:
+            raise AccessError(" This hold was placed by another user.")
+        if customer_id and hold_customer_id and int(customer_id) != hold_customer_id:
+            raise ValidationError(" This hold was placed for another customer.")
+        self.env.cr.execute("""
+            DELETE FROM workspace_booking_hold
+             WHERE id = %s
+         RETURNING space_id, booking_type, duration_value, start_date, end_date
+        """, [self.id])
+        space_id, booking_type, duration_value, start_date, end_date = self.env.cr.fetchone()
+        self.invalidate_recordset()
+        return self.env['workspace.booking'].create(dict(
+            vals,
+            space_id=space_id,
+            customer_id=hold_customer_id or customer_id,
+            booking_type=booking_type,
+            duration_value=duration_value,
+            start_date=start_date,
+            end_date=end_date,
+            status='pending',
+        ))
+
+    def action_release(self):
+        """Libère le créneau sans attendre l'échéance"""
+        self.unlink()
+
+    def unlink(self):
+        # Comme pour la promotion : seule la session qui a posé le blocage peut le libérer
+        if not self.env.su and any(hold.create_uid.id != self.env.uid for hold in self.sudo()):
+            raise AccessError(" This hold was placed by another user.")
+        return super().unlink()
+
+    @api.model
+    def _cron_sweep(self, batch_size=HOLD_SWEEP_BATCH_SIZE):
+        """Supprime par lots les blocages échus, sans attendre les lignes verrouillées"""
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        started = time.monotonic()
+        total = 0
+        while True:
+            self.env.cr.execute("""
+                DELETE FROM workspace_booking_hold
+                 WHERE id IN (
+                       SELECT id
+                         FROM workspace_booking_hold
+                        WHERE expires_at <= (now() at time zone 'UTC')
+                        LIMIT %s
+                          FOR UPDATE SKIP LOCKED
+                 )
+            """, [batch_size])
+            swept = self.env.cr.rowcount
+            total += swept
+            if auto_commit:
+                self.env.cr.commit()
+            if swept < batch_size:
+                break
+        self.invalidate_model()
+        _logger.info("Booking holds: %s expired hold(s) swept in %.2fs", total, time.monotonic() - started)
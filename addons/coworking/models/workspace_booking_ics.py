@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+
+from odoo import models, api, tools
+from odoo.tools import SQL
+
+from .workspace_booking_tombstone import TOMBSTONE_RETENTION_DAYS
+
+# Flux complet : réservations terminées depuis au plus ce nombre de jours, et à venir
+ICS_PAST_DAYS = 30
+# Une transaction validée en retard peut porter un write_date antérieur au jeton :
+# le flux incrémental repart de ce nombre de secondes avant le jeton (mises à jour idempotentes)
+ICS_SYNC_OVERLAP_SECONDS = 60
+ICS_TOKEN_FORMAT = '%Y%m%dT%H%M%S%f'
+# Colonnes par lesquelles un flux peut être filtré
+ICS_FEED_FIELDS = ('space_id', 'customer_id')
+ICS_STATUS = {
+    'pending': 'TENTATIVE',
+    'confirmed': 'CONFIRMED',
+    'completed': 'CONFIRMED',
+    'cancelled': 'CANCELLED',
+}
+
+
+def ics_escape(value):
+    """Échappe un texte selon la RFC 5545 (section 3.3.11)"""
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def ics_fold(line):
+    """Replie une ligne de contenu à 75 octets (RFC 5545, section 3.1)"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while encoded:
+        size = 75 if not parts else 74
+        # Ne jamais couper au milieu d'un caractère UTF-8
+        while size < len(encoded) and (encoded[size] & 0xC0) == 0x80:
+            size -= 1
+        parts.append(encoded[:size].decode())
+        encoded = encoded[size:]
+    return '\r\n '.join(parts)
+
+
+def ics_datetime(value):
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def ics_token(value):
+    """Jeton de synchronisation : date de la dernière modification vue"""
+    return value.strftime(ICS_TOKEN_FORMAT) if value else '0'
+
+
+def ics_parse_token(token):
+    """Date du jeton, ou None si le jeton est absent ou illisible"""
+    if not token or token == '0':
+        return None
+    try:
+        return datetime.strptime(token, ICS_TOKEN_FORMAT)
+    except ValueError:
+        return None
+
+
+class WorkspaceBooking(models.Model):
+    _inherit = 'workspace.booking'
+
+    def init(self):
+        super().init()
+        # Flux iCalendar : dernière modification et changements depuis un jeton
+        tools.create_index(
+            self.env.cr, 'workspace_booking_space_write_idx', self._table, ['space_id', 'write_date'],
+        )
+        tools.create_index(
+            self.env.cr, 'workspace_booking_customer_write_idx', self._table, ['customer_id', 'write_date'],
+        )
+
+    def write(self, vals):
+        # Une réservation déplacée vers un autre espace ou client quitte l'ancien flux :
+        # sans trace, ce flux resterait inchangé et garderait l'événement
+        for field_name in ICS_FEED_FIELDS:
+            if vals.get(field_name):
+                moved = self.filtered(lambda booking: booking[field_name].id != vals[field_name])
+                self.env['workspace.booking.tombstone']._record(moved.ids, field_name)
+        return super().write(vals)
+
+    @api.model
+    def _ics_version(self, field_name, record_id):
+        """Dernière modification et dernière suppression du flux, en deux lectures d'index
+
+        Le couple ne change que si une réservation du flux est créée, modifiée,
+        annulée ou supprimée : il sert de clé de cache et de validateur HTTP.
+        """
+        assert field_name in ICS_FEED_FIELDS
+        self.flush_model()
+        self.env['workspace.booking.tombstone'].flush_model()
+        self.env.cr.execute(SQL(
+            """
+            SELECT (SELECT max(write_date) FROM workspace_booking WHERE %(field)s = %(id)s),
+                   (SELECT max(deleted_date) FROM workspace_booking_tombstone WHERE %(field)s = %(id)s)
+            """,
+            field=SQL.identifier(field_name),
+            id=record_id,
+        ))
+        return self.env.cr.fetchone()
+
+    @api.model
+    def _ics_changes(self, field_name, record_id, since=None):
+        """Réservations et suppressions à envoyer depuis la date since
+
+        Sans since (ou si since dépasse la rétention des suppressions), renvoie le
+        flux complet : réservations non annulées récentes ou à venir, sans suppression.
+        Une réservation déplacée vers un autre espace ou client figure parmi les
+        suppressions de son ancien flux.
+        """
+        assert field_name in ICS_FEED_FIELDS
+        now = datetime.utcnow()
+        if since and since < now - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+            since = None
+        if since is None:
+            bookings = self.search([
+                (field_name, '=', record_id),
+                ('status', '!=', 'cancelled'),
+                ('end_date', '>=', now - timedelta(days=ICS_PAST_DAYS)),
+            ], order='start_date')
+            return bookings, []
+        since = since - timedelta(seconds=ICS_SYNC_OVERLAP_SECONDS)
+        bookings = self.search([(field_name, '=', record_id), ('write_date', '>', since)], order='start_date')
+        # Une réservation revenue dans le flux après l'avoir quitté n'est pas une suppression
+        tombstones = self.env['workspace.booking.tombstone'].search_read(
+            [(field_name, '=', record_id), ('deleted_date', '>', since), ('booking_id', 'not in', bookings.ids)],
+            ['booking_id', 'start_date', 'end_date', 'deleted_date'],
+        )
+        return bookings, tombstones
+
+    @api.model
+    def _ics_render(self, calendar_name, bookings, tombstones, sync_token):
+        """Calendrier iCalendar (RFC 5545) des réservations et suppressions données"""
+        lines = [
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            'PRODID:-//Coworking//Bookings//EN',
+            'CALSCALE:GREGORIAN',
+            'METHOD:PUBLISH',
+            f'X-WR-CALNAME:{ics_escape(calendar_name)}',
+            'X-PUBLISHED-TTL:PT5M',
+            f'X-COWORKING-SYNC-TOKEN:{sync_token}',
+        ]
+        for booking in bookings:
+            lines += [
+                'BEGIN:VEVENT',
+                f'UID:booking-{booking.id}@coworking',
+                f'DTSTAMP:{ics_datetime(booking.write_date)}',
+                f'LAST-MODIFIED:{ics_datetime(booking.write_date)}',
+                f'SEQUENCE:{int(booking.write_date.timestamp())}',
+                f'DTSTART:{ics_datetime(booking.start_date)}',
+                f'DTEND:{ics_datetime(booking.end_date)}',
+                f'SUMMARY:{ics_escape(booking.name)}',
+                f'LOCATION:{ics_escape(booking.space_id.name)}',
+                f'STATUS:{ICS_STATUS.get(booking.status, "CONFIRMED")}',
+                'END:VEVENT',
+            ]
+        for tombstone in tombstones:
+            lines += [
+                'BEGIN:VEVENT',
+                f'UID:booking-{tombstone["booking_id"]}@coworking',
+                f'DTSTAMP:{ics_datetime(tombstone["deleted_date"])}',
+                f'SEQUENCE:{int(tombstone["deleted_date"].timestamp())}',
+                f'DTSTART:{ics_datetime(tombstone["start_date"])}',
+                f'DTEND:{ics_datetime(tombstone["end_date"])}',
+                'STATUS:CANCELLED',
+                'END:VEVENT',
+            ]
+        lines.append('END:VCALENDAR')
+        return '\r\n'.join(ics_fold(line) for line in lines) + '\r\n'
+
@@ -0,0 +1,198 @@
+from dateutil import rrule
+
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+
+from .workspace_bookings import booking_end_date
+
+# Garde-fou : nombre maximal d'occurrences générées pour une série
+MAX_OCCURRENCES = 500
+
+WEEKDAYS = [
+    ('mon', rrule.MO),
+    ('tue', rrule.TU),
+    ('wed', rrule.WE),
+    ('thu', rrule.TH),
+    ('fri', rrule.FR),
+    ('sat', rrule.SA),
+    ('sun', rrule.SU),
+]
+FREQUENCIES = {
+    'daily': rrule.DAILY,
+    'weekly': rrule.WEEKLY,
+    'monthly': rrule.MONTHLY,
+}
+# Champs dont la modification régénère les occurrences futures
+PATTERN_FIELDS = [
+    'space_id', 'customer_id', 'booking_type', 'duration_value', 'start_date',
+    'frequency', 'interval', 'end_type', 'count', 'until',
+] + [day for day, _weekday in WEEKDAYS]
+
+
+class WorkspaceBookingSeries(models.Model):
+    _name = 'workspace.booking.series'
+    _description = 'Workspace Booking Series'
+    _order = 'start_date desc'
+
+    name = fields.Char(string='Name', compute='_compute_name', store=True)
+    space_id = fields.Many2one('workspace.space', string='Space', required=True)
+    customer_id = fields.Many2one('coworking.customer', string='Customer', required=True)
+    booking_type = fields.Selection([
+        ('hourly', 'Hourly'),
+        ('daily', 'Daily'),
+    ], string='Booking Type', required=True, default='hourly')
+    duration_value = fields.Float(string='Duration', default=1.0, required=True)
+    start_date = fields.Datetime(string='First Occurrence', required=True, default=fields.Datetime.now)
+
+    frequency = fields.Selection([
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ], string='Repeat', required=True, default='weekly')
+    interval = fields.Integer(string='Every', default=1, required=True)
+    mon = fields.Boolean(string='Mon')
+    tue = fields.Boolean(string='Tue')
+    wed = fields.Boolean(string='Wed')
+    thu = fields.Boolean(string='Thu')
+    fri = fields.Boolean(string='Fri')
+    sat = fields.Boolean(string='Sat')
+    sun = fields.Boolean(string='Sun')
+    end_type = fields.Selection([
+        ('count', 'Number of occurrences'),
+        ('until', 'Until date'),
+    ], string='Ends', required=True, default='count')
+    count = fields.Integer(string='Occurrences', default=10)
+    until = fields.Date(string='Until')
+
+    booking_ids = fields.One2many('workspace.booking', 'series_id', string='Bookings')
+    booking_count = fields.Integer(string='Booking Count', compute='_compute_booking_count')
+
+    @api.depends('space_id', 'customer_id', 'frequency')
+    def _compute_name(self):
+        """Calcule le nom à afficher pour la série"""
+        labels = dict(self._fields['frequency'].selection)
+        for series in self:
+            series.name = f"{series.space_id.name} - {series.customer_id.name} ({labels.get(series.frequency, '')})"
+
+    def _compute_booking_count(self):
+        counts = dict(self.env['workspace.booking']._read_group(
+            [('series_id', 'in', self.ids)], ['series_id'], ['__count'],
+        ))
+        for series in self:
+            series.booking_count = counts.get(series, 0)
+
+    @api.constrains('interval', 'count', 'until', 'end_type')
+    def _check_pattern(self):
+        """Vérifie que la règle de récurrence est exploitable"""
+        for series in self:
+            if series.interval <= 0:
+                raise ValidationError(" Repeat interval must be greater than 0.")
+            if series.end_type == 'count' and not 0 < series.count <= MAX_OCCURRENCES:
+                raise ValidationError(f" Number of occurrences must be between 1 and {MAX_OCCURRENCES}.")
+            if series.end_type == 'until' and not series.until:
+                raise ValidationError(" Please set an end date for the series.")
+
+    def _iter_occurrences(self, after=None):
+        """Génère paresseusement les débuts d'occurrence de la série (règle RRULE)"""
+        self.ensure_one()
+        byweekday = [weekday for day, weekday in WEEKDAYS if self[day]] if self.frequency == 'weekly' else None
+        rule = rrule.rrule(
+            FREQUENCIES[self.frequency],
+            dtstart=self.start_date,
+            interval=self.interval,
+            byweekday=byweekday or None,
+            count=self.count if self.end_type == 'count' else None,
+            until=fields.Datetime.to_datetime(self.until).replace(hour=23, minute=59, second=59)
+            if self.end_type == 'until' else None,
+        )
+        for index, start_date in enumerate(rule):
+            if index >= MAX_OCCURRENCES:
+                raise ValidationError(
+                    f" A series cannot have more than {MAX_OCCURRENCES} occurrences, please choose an earlier end date."
+                )
+            if after is None or start_date >= after:
+                yield start_date
+
+    def _occurrence_vals(self, start_date):
+        return {
+            'series_id': self.id,
+            'space_id': self.space_id.id,
+            'customer_id': self.customer_id.id,
+            'booking_type': self.booking_type,
+            'duration_value': self.duration_value,
+            'start_date': start_date,
+            'end_date': booking_end_date(self.booking_type, start_date, self.duration_value),
+        }
+
+    def _create_occurrences(self, vals_list, replaced=None):
+        """Valide toutes les occurrences en une requête puis les crée en un seul appel
+
+        Les occurrences remplacées sont annulées, pas supprimées : elles restent dans
+        l'historique et les flux. La liste d'attente n'est servie qu'après la création,
+        sur les créneaux que la nouvelle règle n'a pas repris.
+        """
+        Booking = self.env['workspace.booking']
+        replaced = replaced if replaced is not None else Booking
+        intervals = Booking._intervals_from_vals(vals_list)
+        existing_conflicts, batch_conflicts = Booking._find_conflicts(intervals, exclude_ids=replaced.ids)
+        if existing_conflicts or batch_conflicts:
+            dates = [
+                fields.Datetime.to_string(vals_list[index]['start_date'])
+                for index in sorted({index for index, _booking_id in existing_conflicts}
+                                    | {second for _first, second in batch_conflicts})
+            ]
+            raise ValidationError(
+                f" Space '{self.space_id.name}' is already booked for these occurrences:\n" + "\n".join(dates)
+            )
+        freed = [(booking.space_id.id, booking.start_date, booking.end_date) for booking in replaced]
+        replaced.with_context(defer_waitlist=True).write({'status': 'cancelled'})
+        bookings = Booking.with_context(skip_availability_batch=True).create(vals_list)
+        self.env['workspace.waitlist']._promote(freed)
+        return bookings
+
+    def _sync_future_occurrences(self):
+        """Aligne les occurrences futures sur la règle, sans toucher celles qui n'ont pas changé"""
+        now = fields.Datetime.now()
+        for series in self:
+            future = series.booking_ids.filtered(
+                lambda booking: booking.start_date >= now and booking.status in ('pending', 'confirmed')
+            )
+            wanted = {start_date: series._occurrence_vals(start_date) for start_date in series._iter_occurrences(after=now)}
+            unchanged = future.filtered(lambda booking: booking.start_date in wanted and all(
+                (booking[name].id if name.endswith('_id') else booking[name]) == value
+                for name, value in wanted[booking.start_date].items() if name != 'series_id'
+            ))
+            for booking in unchanged:
+                del wanted[booking.start_date]
+            series._create_occurrences(list(wanted.values()), replaced=future - unchanged)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        series_list = super().create(vals_list)
+        for series in series_list:
+            series._create_occurrences([series._occurrence_vals(start_date) for start_date in series._iter_occurrences()])
+        return series_list
+
+    def write(self, vals):
+        res = super().write(vals)
+        if any(field in vals for field in PATTERN_FIELDS):
+            self._sync_future_occurrences()
+        return res
+
+    def action_cancel_future(self):
+        """Annule en une écriture toutes les occurrences à venir"""
+        now = fields.Datetime.now()
+        self.booking_ids.filtered(
+            lambda booking: booking.start_date >= now and booking.status in ('pending', 'confirmed')
+        ).write({'status': 'cancelled'})
+
+    def action_view_bookings(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Bookings',
+            'res_model': 'workspace.booking',
+            'view_mode': 'tree,form,calendar',
+            'domain': [('series_id', '=', self.id)],
+            'context': {'default_series_id': self.id},
+        }
@@ -0,0 +1,65 @@
+from odoo import models, fields, api, tools
+
+# Durée de conservation des traces de suppression : un jeton plus ancien
+# ne permet plus de synchronisation incrémentale, le client repart d'un flux complet
+TOMBSTONE_RETENTION_DAYS = 30
+
+
+class WorkspaceBookingTombstone(models.Model):
+    _name = 'workspace.booking.tombstone'
+    _description = 'Deleted Workspace Booking'
+    _order = 'deleted_date desc'
+
+    booking_id = fields.Integer(string='Booking ID', readonly=True)
+    space_id = fields.Many2one('workspace.space', string='Space', readonly=True, ondelete='cascade')
+    customer_id = fields.Many2one('coworking.customer', string='Customer', readonly=True, ondelete='cascade')
+    start_date = fields.Datetime(string='Start Date', readonly=True)
+    end_date = fields.Datetime(string='End Date', readonly=True)
+    deleted_date = fields.Datetime(string='Deleted On', readonly=True)
+
+    def init(self):
+        # Flux iCalendar : suppressions d'un espace ou d'un client depuis un jeton
+        tools.create_index(
+            self.env.cr, 'workspace_booking_tombstone_space_idx', self._table, ['space_id', 'deleted_date'],
+        )
+        tools.create_index(
+            self.env.cr, 'workspace_booking_tombstone_customer_idx', self._table, ['customer_id', 'deleted_date'],
+        )
+
+    @api.model
+    def _record(self, booking_ids, field_name=None):
+        """Trace en une instruction les réservations sur le point de quitter leurs flux
+
+        Sans field_name, la réservation est supprimée et quitte les flux de son espace
+        et de son client. Avec field_name ('space_id' ou 'customer_id'), elle ne
+        quitte que le flux de son ancienne valeur : l'autre colonne reste vide.
+        """
+        if not booking_ids:
+            return
+        self.env['workspace.booking'].flush_model(['space_id', 'customer_id', 'start_date', 'end_date'])
+        self.env.cr.execute("""
+            INSERT INTO workspace_booking_tombstone
+                   (booking_id, space_id, customer_id, start_date, end_date, deleted_date,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT id,
+                   CASE WHEN %(space)s THEN space_id END,
+                   CASE WHEN %(customer)s THEN customer_id END,
+                   start_date, end_date, now() at time zone 'UTC',
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM workspace_booking
+             WHERE id = ANY(%(ids)s)
+        """, {
+            'ids': list(booking_ids),
+            'space': field_name in (None, 'space_id'),
+            'customer': field_name in (None, 'customer_id'),
+            'uid': self.env.uid,
+        })
+
+    @api.model
+    def _purge(self, retention_days=TOMBSTONE_RETENTION_DAYS):
+        """Supprime les traces plus anciennes que la rétention"""
+        self.env.cr.execute("""
+            DELETE FROM workspace_booking_tombstone
+             WHERE deleted_date < (now() at time zone 'UTC') - make_interval(days => %s)
+        """, [retention_days])
+        return self.env.cr.rowcount
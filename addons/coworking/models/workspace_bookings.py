@@ -1,14 +1,101 @@
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
+from psycopg2 import errors
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError
+from odoo.tools import SQL
+
+from .coworking_perf_stat import instrumented
+
+_logger = logging.getLogger(__name__)
+
+# Taille des lots du cron de cycle de vie, et durée de vie par défaut d'une réservation en attente
+LIFECYCLE_BATCH_SIZE = 5000
+DEFAULT_PENDING_TTL_HOURS = 48
+
+# Champs qui participent à la contrainte d'exclusion sur les créneaux
+OVERLAP_FIELDS = ['space_id', 'start_date', 'end_date', 'status']
+# Champs renvoyés par le flux de réservations (calendrier, bornes)
+FEED_FIELDS = ['name', 'space_id', 'customer_id', 'status', 'start_date', 'end_date']
+# Champs dont la modification invalide le rapport d'occupation
+OCCUPANCY_FIELDS = OVERLAP_FIELDS + ['booking_type', 'duration_value', 'total_price']
+# Champs dont la modification peut déplacer ou réactiver un créneau
+SLOT_FIELDS = OVERLAP_FIELDS + ['booking_type', 'duration_value']
+# Premier argument de pg_advisory_xact_lock(int, int) : isole nos verrous de ceux d'autres modules
+SPACE_LOCK_NAMESPACE = 0x636f7721
+
+
+def booking_end_date(booking_type, start_date, duration_value):
+    """Date de fin d'une réservation selon son type et sa durée"""
+    if booking_type == 'hourly':
+        return start_date + timedelta(hours=duration_value)
+    if booking_type == 'daily':
+        return start_date + timedelta(days=duration_value)
+    if booking_type == 'monthly':
+        return start_date + timedelta(days=30 * duration_value)
+    return False
+
+
+def booking_dates_error(start_date, end_date, allow_past=False):
+    """Message d'erreur si les dates sont incohérentes, sinon None
+
+    allow_past accepte les réservations passées (reprise d'historique par import).
+    """
+    if start_date and end_date:
+        if start_date >= end_date:
+            return " End date must be strictly after start date."
+
+        # Vérifier que la réservation n'est pas trop dans le passé
+        if not allow_past and start_date < datetime.now() - timedelta(days=1):
+            return " Cannot book dates in the past."
+    return None
+
+
+def booking_duration_error(booking_type, duration_value):
+    """Message d'erreur si la durée est invalide pour le type, sinon None"""
+    if duration_value <= 0:
+        return " Duration must be greater than 0."
+
+    if booking_type == 'hourly':
+        if duration_value > 168:  # 7 jours max en heures
+            return " Maximum 168 hours (7 days) per hourly booking."
+        if duration_value < 0.5:
+            return " Minimum 30 minutes for hourly booking."
+
+    elif booking_type == 'daily':
+        if duration_value > 90:
+            return " Maximum 90 days per daily booking."
+        if duration_value < 0.5:
+            return " Minimum half day (0.5) for daily booking."
+
+    elif booking_type == 'monthly':
+        if duration_value > 24:
+            return " Maximum 24 months per monthly booking."
+        if duration_value < 0.5:
+            return " Minimum half month (0.5) for monthly booking."
+    return None
+
+
 class WorkspaceBooking(models.Model):
     _name = 'workspace.booking'
     _description = 'Workspace Booking'
     _order = 'start_date desc'
-    name = fields.Char(string='Name', compute='_compute_name', store=True)
-    space_id = fields.Many2one('workspace.space', string='Space', required=True)
-    customer_id = fields.Many2one('coworking.customer', string='Customer', required=True)
+    _sql_constraints = [
+        ('space_period_no_overlap',
+         "EXCLUDE USING gist (space_id WITH =, tsrange(start_date, end_date) WITH &&) "
+         "WHERE (status IS DISTINCT FROM 'cancelled' AND end_date > start_date)",
+         "This space is already booked for this period."),
+    ]
+
+    name = fields.Char(string='Name', compute='_compute_name', store=True, precompute=True)
+    space_id = fields.Many2one('workspace.space', string='Space', required=True, index=True)
+    customer_id = fields.Many2one('coworking.customer', string='Customer', required=True, index=True)
     booking_type = fields.Selection([
         ('hourly', 'Hourly'),
         ('daily', 'Daily'),
@@ -16,9 +103,9 @@ class WorkspaceBooking(models.Model):
     ], string='Booking Type', required=True)
     
     duration_value = fields.Float(string='Duration', default=1.0, required=True)
-    start_date = fields.Datetime(string='Start Date', required=True, default=fields.Datetime.now)
-    end_date = fields.Datetime(string='End Date', compute='_compute_end_date', store=True, readonly=False)
-    total_price = fields.Float(string='Total Price', compute='_compute_total_price', store=True)
+    start_date = fields.Datetime(string='Start Date', required=True, default=fields.Datetime.now, index=True)
+    end_date = fields.Datetime(string='End Date', compute='_compute_end_date', store=True, readonly=False, precompute=True)
+    total_price = fields.Float(string='Total Price', compute='_compute_total_price', store=True, precompute=True)
     
     status = fields.Selection([
         ('pending', 'Pending'),
@@ -28,21 +115,21 @@ class WorkspaceBooking(models.Model):
     ], string='Status', default='pending')
     
     notes = fields.Text(string='Notes')
+    series_id = fields.Many2one('workspace.booking.series', string='Recurring Series', ondelete='set null', index='btree_not_null')
     created_date = fields.Datetime(string='Created Date', default=fields.Datetime.now)
 
     @api.depends('booking_type', 'duration_value', 'start_date')
+    @instrumented
     def _compute_end_date(self):
         """Calcule la date de fin en fonction du type et de la durée"""
         for booking in self:
             if booking.start_date and booking.duration_value:
-                if booking.booking_type == 'hourly':
-                    booking.end_date = booking.start_date + timedelta(hours=booking.duration_value)
-                elif booking.booking_type == 'daily':
-                    booking.end_date = booking.start_date + timedelta(days=booking.duration_value)
-                elif booking.booking_type == 'monthly':
-                    booking.end_date = booking.start_date + timedelta(days=30 * booking.duration_value)
+                end_date = booking_end_date(booking.booking_type, booking.start_date, booking.duration_value)
+                if end_date:
+                    booking.end_date = end_date
 
     @api.depends('space_id', 'booking_type', 'duration_value')
+    @instrumented
     def _compute_total_price(self):
         """Calcule le prix total"""
         for booking in self:
@@ -55,60 +142,352 @@ class WorkspaceBooking(models.Model):
                     booking.total_price = booking.duration_value * booking.space_id.monthly_rate
 
     @api.constrains('start_date', 'end_date')
+    @instrumented
     def _check_dates(self):
         """Vérifie la cohérence des dates"""
+        allow_past = self.env.context.get('booking_import')
         for booking in self:
-            if booking.start_date and booking.end_date:
-                if booking.start_date >= booking.end_date:
-                    raise ValidationError(" End date must be strictly after start date.")
-                
-                # Vérifier que la réservation n'est pas trop dans le passé
-                if booking.start_date < datetime.now() - timedelta(days=1):
-                    raise ValidationError(" Cannot book dates in the past.")
+            error = booking_dates_error(booking.start_date, booking.end_date, allow_past)
+            if error:
+                raise ValidationError(error)
 
     @api.constrains('duration_value')
+    @instrumented
     def _check_duration(self):
         """Vérifie que la durée est valide selon le type"""
         for booking in self:
-            if booking.duration_value <= 0:
-                raise ValidationError(" Duration must be greater than 0.")
-            
-            if booking.booking_type == 'hourly':
-                if booking.duration_value > 168:  # 7 jours max en heures
-                    raise ValidationError(" Maximum 168 hours (7 days) per hourly booking.")
-                if booking.duration_value < 0.5:
-                    raise ValidationError(" Minimum 30 minutes for hourly booking.")
-                    
-            elif booking.booking_type == 'daily':
-                if booking.duration_value > 90:
-                    raise ValidationError(" Maximum 90 days per daily booking.")
-                if booking.duration_value < 0.5:
-                    raise ValidationError(" Minimum half day (0.5) for daily booking.")
-                    
-            elif booking.booking_type == 'monthly':
-                if booking.duration_value > 24:
-                    raise ValidationError(" Maximum 24 months per monthly booking.")
-                if booking.duration_value < 0.5:
-                    raise ValidationError(" Minimum half month (0.5) for monthly booking.")
-
-    @api.constrains('space_id', 'start_date', 'end_date')
+            error = booking_duration_error(booking.booking_type, booking.duration_value)
+            if error:
+                raise ValidationError(error)
+
+    def _auto_init(self):
+        # btree_gist est nécessaire pour combiner space_id (=) et tsrange (&&) dans l'index GiST
+        self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        return super()._auto_init()
+
+    def init(self):
+        # Vue calendrier : fenêtre "end_date >= début AND start_date <= fin"
+        tools.create_index(
+            self.env.cr, 'workspace_booking_end_start_idx', self._table, ['end_date', 'start_date'],
+        )
+        # Recherches ORM de créneaux actifs : même prédicat que le domaine ('status', 'not in', ['cancelled'])
+        tools.create_index(
+            self.env.cr, 'workspace_booking_space_active_idx', self._table,
+            ['space_id', 'start_date', 'end_date'],
+            where="status <> 'cancelled' OR status IS NULL",
+        )
+        # Cron de cycle de vie : seules les réservations encore ouvertes sont indexées
+        tools.create_index(
+            self.env.cr, 'workspace_booking_confirmed_end_idx', self._table, ['end_date'],
+            where="status = 'confirmed'",
+        )
+        tools.create_index(
+            self.env.cr, 'workspace_booking_pending_create_idx', self._table, ['create_date'],
+            where="status = 'pending'",
+        )
+
+    @contextmanager
+    def _overlap_guard(self):
+        """Traduit une violation de la contrainte d'exclusion en ValidationError lisible"""
+        try:
+            with self.env.cr.savepoint():
+                yield
+        except errors.ExclusionViolation as e:
+            match = re.search(r'\)=\((\d+),', e.diag.message_detail or '')
+            space = self.env['workspace.space'].browse(int(match.group(1)) if match else [])
+            if space.exists():
+                raise ValidationError(
+                    f" Space '{space.name}' is already booked for this period."
+                ) from None
+            raise ValidationError(" This space is already booked for this period.") from None
+
+    @api.model
+    def _lock_spaces(self, space_ids):
+        """Verrou transactionnel par espace, pris dans l'ordre croissant des identifiants
+
+        Les créations et modifications sur un même espace se succèdent au lieu de
+        se heurter. Le verrou ne renouvelle pas l'instantané REPEATABLE READ de la
+        transaction : une réservation validée pendant l'attente reste invisible à
+        la vérification de disponibilité, et seule la contrainte d'exclusion GiST
+        garantit l'absence de chevauchement. Des espaces différents ne se bloquent
+        jamais, et l'ordre fixe exclut les interblocages. Les verrous sont libérés
+        au commit ou au rollback.
+        """
+        space_ids = sorted({space_id for space_id in space_ids if space_id})
+        if not space_ids:
+            return
+        self.env.cr.execute("""
+            SELECT pg_advisory_xact_lock(%s, s.id)
+              FROM (SELECT unnest(%s::int[]) AS id ORDER BY 1) s
+        """, [SPACE_LOCK_NAMESPACE, space_ids])
+
+    @api.model
+    def _intervals_from_vals(self, vals_list):
+        """Extrait (index, space_id, début, fin) des valeurs de création non annulées"""
+        intervals = []
+        for index, vals in enumerate(vals_list):
+            if vals.get('status') == 'cancelled' or not vals.get('space_id'):
+                continue
+            start_date = fields.Datetime.to_datetime(vals.get('start_date')) or fields.Datetime.now()
+            end_date = fields.Datetime.to_datetime(vals.get('end_date')) or booking_end_date(
+                vals.get('booking_type'), start_date, vals.get('duration_value', 1.0),
+            )
+            if end_date and start_date < end_date:
+                intervals.append((index, vals['space_id'], start_date, end_date))
+        return intervals
+
+    @api.model
+    def _find_conflicts(self, intervals, exclude_ids=(), holds_only=False):
+        """Conflits d'un lot d'intervalles (index, space_id, début, fin)
+
+        Une requête unique recherche les conflits avec les réservations existantes
+        (hors exclude_ids) et les blocages non échus pour tous les espaces du lot, puis
+        un balayage trié détecte les conflits entre intervalles du même lot. Avec
+        holds_only, seuls les blocages sont recherchés (lot déjà validé par l'appelant).
+        Renvoie ([(index, booking_id)], [(index, index)]), booking_id valant None
+        pour un blocage temporaire.
+        """
+        if not intervals:
+            return [], []
+        self.flush_model(OVERLAP_FIELDS)
+        indexes, space_ids, starts, ends = zip(*intervals)
+        self.env.cr.execute("""
+            WITH n AS (
+                SELECT *
+                  FROM unnest(%(indexes)s::int[], %(space_ids)s::int[], %(starts)s::timestamp[], %(ends)s::timestamp[])
+                       AS n(idx, space_id, start_date, end_date)
+            )
+            SELECT n.idx, b.id
+              FROM n
+              JOIN workspace_booking b
+                ON b.space_id = n.space_id
+               AND tsrange(b.start_date, b.end_date) && tsrange(n.start_date, n.end_date)
+             WHERE NOT %(holds_only)s
+               AND b.status IS DISTINCT FROM 'cancelled'
+               AND b.end_date > b.start_date
+               AND b.id != ALL(%(exclude_ids)s::int[])
+             UNION ALL
+            SELECT DISTINCT n.idx, NULL::int
+              FROM n
+              JOIN workspace_booking_hold h
+                ON h.space_id = n.space_id
+               AND tsrange(h.start_date, h.end_date) && tsrange(n.start_date, n.end_date)
+             WHERE h.expires_at > (now() at time zone 'UTC')
+             ORDER BY 1, 2
+        """, {
+            'holds_only': bool(holds_only),
+            'indexes': list(indexes),
+            'space_ids': list(space_ids),
+            'starts': list(starts),
+            'ends': list(ends),
+            'exclude_ids': list(exclude_ids),
+        })
+        existing_conflicts = self.env.cr.fetchall()
+        if holds_only:
+            return existing_conflicts, []
+
+        batch_conflicts = []
+        by_space = {}
+        for interval in intervals:
+            by_space.setdefault(interval[1], []).append(interval)
+        for space_intervals in by_space.values():
+            space_intervals.sort(key=lambda interval: interval[2])
+            active = []
+            for interval in space_intervals:
+                active = [other for other in active if other[3] > interval[2]]
+                batch_conflicts.extend(tuple(sorted((other[0], interval[0]))) for other in active)
+                active.append(interval)
+        return existing_conflicts, sorted(batch_conflicts)
+
+    @api.model
+    @instrumented
+    def _check_availability_batch(self, vals_list, holds_only=False):
+        """Valide en une seule passe les créneaux d'un lot de réservations
+
+        Tous les conflits, avec l'existant comme au sein du lot, sont signalés ensemble.
+        """
+        self._check_intervals(self._intervals_from_vals(vals_list), single=len(vals_list) == 1, holds_only=holds_only)
+
+    @api.model
+    def _check_intervals(self, intervals, exclude_ids=(), single=False, holds_only=False):
+        """Lève une ValidationError qui liste les conflits des intervalles (index, space_id, début, fin)"""
+        existing_conflicts, batch_conflicts = self._find_conflicts(intervals, exclude_ids, holds_only)
+        if not existing_conflicts and not batch_conflicts:
+            return
+        spaces = {interval[0]: interval[1] for interval in intervals}
+        names = {space.id: space.name for space in self.env['workspace.space'].browse(set(spaces.values()))}
+        if single:
+            # Une réservation précède un blocage sur le même intervalle (tri NULLS LAST)
+            index, booking_id = existing_conflicts[0]
+            state = 'already booked' if booking_id else 'temporarily held'
+            messages = [f" Space '{names[spaces[index]]}' is {state} for this period."]
+        else:
+            messages = [
+                f" Line {index + 1}: space '{names[spaces[index]]}' is already booked for this period (booking #{booking_id})."
+                if booking_id else
+                f" Line {index + 1}: space '{names[spaces[index]]}' is temporarily held for this period."
+                for index, booking_id in existing_conflicts
+            ] + [
+                f" Lines {first + 1} and {second + 1}: both book space '{names[spaces[first]]}' for overlapping periods."
+                for first, second in batch_conflicts
+            ]
+        raise ValidationError("\n".join(messages))
+
+    @api.model_create_multi
+    @instrumented
+    def create(self, vals_list):
+        self._lock_spaces(
+            vals.get('space_id') for vals in vals_list if vals.get('status') != 'cancelled'
+        )
+        # Un lot déjà validé par l'appelant est revu pour les seuls blocages, que la
+        # contrainte d'exclusion des réservations ne couvre pas
+        self._check_availability_batch(vals_list, holds_only=self.env.context.get('skip_availability_batch'))
+        with self._overlap_guard():
+            bookings = super().create(vals_list)
+        bookings._mark_occupancy_dirty()
+        return bookings
+
+    @instrumented
+    def write(self, vals):
+        if any(field in vals for field in SLOT_FIELDS) and vals.get('status') != 'cancelled':
+            self._lock_spaces(self.space_id.ids + [vals.get('space_id')])
+        track_occupancy = any(field in vals for field in OCCUPANCY_FIELDS)
+        if track_occupancy:
+            self._mark_occupancy_dirty()
+        # Créneaux libérés par une annulation : la liste d'attente est servie dans la même transaction,
+        # sauf si l'appelant (remplacement d'occurrences) s'en charge après avoir réoccupé les créneaux
+        freed = [
+            (booking.space_id.id, booking.start_date, booking.end_date)
+            for booking in self if booking.status != 'cancelled'
+        ] if vals.get('status') == 'cancelled' and not self.env.context.get('defer_waitlist') else []
+        # Créneaux déplacés ou réactivés : à confronter aux blocages comme à la création
+        if vals.get('status') == 'cancelled':
+            occupied = self.browse()
+        elif any(field in vals for field in SLOT_FIELDS if field != 'status'):
+            occupied = self
+        else:
+            occupied = self.filtered(lambda booking: booking.status == 'cancelled') if 'status' in vals else self.browse()
+        res = super().write(vals)
+        if track_occupancy:
+            self._mark_occupancy_dirty()
+        occupied = occupied.filtered(lambda booking: booking.status != 'cancelled')
+        if occupied:
+            with self._overlap_guard():
+                occupied.flush_recordset(OVERLAP_FIELDS)
+            occupied._check_intervals([
+                (index, booking.space_id.id, booking.start_date, booking.end_date)
+                for index, booking in enumerate(occupied)
+                if booking.start_date and booking.end_date and booking.start_date < booking.end_date
+            ], exclude_ids=occupied.ids, single=len(occupied) == 1)
+        if freed:
+            self.env['workspace.waitlist']._promote(freed)
+        return res
+
+    def unlink(self):
+        self._mark_occupancy_dirty()
+        # Les flux iCalendar incrémentaux doivent apprendre la suppression
+        self.env['workspace.booking.tombstone']._record(self.ids)
+        return super().unlink()
+
+    @api.model
+    def _feed_domain(self, space_ids, start_date, end_date):
+        return [
+            ('space_id', 'in', space_ids),
+            ('start_date', '<', end_date),
+            ('end_date', '>', start_date),
+        ]
+
+    @api.model
+    def _feed_version(self, space_ids, start_date, end_date):
+        """Dernière modification et nombre de réservations de la fenêtre, en une requête
+
+        Le couple change dès qu'une réservation de la fenêtre est créée, modifiée ou
+        supprimée : il sert de validateur HTTP (ETag / Last-Modified) pour le flux.
+        """
+        query = self._search(self._feed_domain(space_ids, start_date, end_date))
+        self.env.cr.execute(SQL(
+            "SELECT max(%s), count(*) FROM %s WHERE %s",
+            SQL.identifier(query.table, 'write_date'),
+            query.from_clause,
+            query.where_clause,
+        ))
+        return self.env.cr.fetchone()
+
+    @api.model
+    def _feed_read(self, space_ids, start_date, end_date):
+        """Réservations de la fenêtre, limitées aux champs utiles au calendrier"""
+        return self.search_read(self._feed_domain(space_ids, start_date, end_date), FEED_FIELDS, order='start_date')
+
+    @api.model
+    @instrumented
+    def get_views(self, views, options=None):
+        return super().get_views(views, options)
+
+    @api.model
+    @instrumented
+    def web_search_read(self, domain, specification, offset=0, limit=None, order=None, count_limit=None):
+        return super().web_search_read(domain, specification, offset=offset, limit=limit, order=order,
+                                       count_limit=count_limit)
+
+    @api.model
+    def _propagate_names(self, field_name, ids):
+        """Réécrit en un UPDATE le nom des réservations après renommage d'espaces ou de clients
+
+        _compute_name ne dépend volontairement pas de space_id.name / customer_id.name :
+        un renommage recalculerait sinon chaque réservation une à une via l'ORM.
+        """
+        if not ids:
+            return
+        self.env['workspace.space'].flush_model(['name'])
+        self.env['coworking.customer'].flush_model(['name'])
+        self.flush_model(['space_id', 'customer_id', 'name', 'display_name'])
+        self.env.cr.execute(f"""
+            UPDATE workspace_booking b
+               SET name = s.name || ' - ' || c.name,
+                   display_name = s.name || ' - ' || c.name,
+                   write_date = (now() at time zone 'UTC')
+              FROM workspace_space s, coworking_customer c
+             WHERE s.id = b.space_id
+               AND c.id = b.customer_id
+               AND b.{field_name} = ANY(%s)
+               AND b.name IS DISTINCT FROM s.name || ' - ' || c.name
+        """, [list(ids)])
+        self.invalidate_model(['name', 'display_name', 'write_date'])
+
+    def _mark_occupancy_dirty(self):
+        """Signale au rapport d'occupation les jours couverts par ces réservations
+
+        Simple ajout au journal, sans ON CONFLICT : aucun verrou partagé entre
+        les transactions qui réservent le même jour.
+        """
+        if not self.ids:
+            return
+        self.flush_recordset(['start_date', 'end_date'])
+        self.env.cr.execute("""
+            INSERT INTO workspace_occupancy_report_dirty (day)
+            SELECT DISTINCT generate_series(
+                       start_date::date,
+                       (end_date - interval '1 microsecond')::date,
+                       interval '1 day'
+                   )::date
+              FROM workspace_booking
+             WHERE id = ANY(%s)
+               AND end_date > start_date
+        """, [self.ids])
+
+    @api.constrains(*OVERLAP_FIELDS)
+    @instrumented
     def _check_availability(self):
-        """Vérifie que l'espace n'est pas déjà réservé"""
-        for booking in self:
-            if booking.space_id and booking.start_date and booking.end_date:
-                overlapping = self.search([
-                    ('space_id', '=', booking.space_id.id),
-                    ('id', '!=', booking.id),
-                    ('status', 'not in', ['cancelled']),
-                    ('start_date', '<', booking.end_date),
-                    ('end_date', '>', booking.start_date)
-                ])
-                if overlapping:
-                    raise ValidationError(
-                        f" Space '{booking.space_id.name}' is already booked for this period."
-                    )
+        """Vérifie que l'espace n'est pas déjà réservé
+
+        Le chevauchement est détecté par la contrainte d'exclusion GiST : il suffit
+        d'envoyer les modifications en base pour qu'un conflit lève une erreur.
+        """
+        with self._overlap_guard():
+            self.flush_recordset(OVERLAP_FIELDS)
 
     @api.depends('space_id', 'customer_id')
+    @instrumented
     def _compute_name(self):
         """Calcule le nom à afficher pour la réservation"""
         for booking in self:
@@ -166,6 +545,76 @@ class WorkspaceBooking(models.Model):
             }
         }
 
+    @api.model
+    def _transition_batch(self, from_status, to_status, condition, params, batch_size):
+        """Passe un lot de réservations de from_status à to_status en un UPDATE
+
+        Les lignes verrouillées par une autre transaction sont ignorées (SKIP LOCKED)
+        et reprises au passage suivant. Renvoie les réservations modifiées.
+        """
+        self.env.cr.execute(f"""
+            UPDATE workspace_booking
+               SET status = %(to_status)s,
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+             WHERE id IN (
+                   SELECT id
+                     FROM workspace_booking
+                    WHERE status = %(from_status)s
+                      AND {condition}
+                    LIMIT %(limit)s
+                      FOR UPDATE SKIP LOCKED
+             )
+         RETURNING id, space_id, start_date, end_date
+        """, dict(params, from_status=from_status, to_status=to_status, uid=self.env.uid, limit=batch_size))
+        rows = self.env.cr.fetchall()
+        bookings = self.browse([row[0] for row in rows])
+        self.invalidate_model(['status', 'write_uid', 'write_date'])
+        # Statistiques clients et rapport d'occupation dépendent du statut
+        bookings.modified(['status'])
+        if to_status == 'cancelled':
+            bookings._mark_occupancy_dirty()
+            self.env['workspace.waitlist']._promote([row[1:] for row in rows])
+        self.env.flush_all()
+        return bookings
+
+    @api.model
+    def _cron_lifecycle(self, batch_size=LIFECYCLE_BATCH_SIZE):
+        """Termine les réservations confirmées échues et expire les réservations en attente
+
+        Travaille par lots bornés avec un commit entre chaque lot : une interruption
+        ne perd que le lot en cours, et la reprise repart des lignes restantes.
+        """
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        ttl_hours = float(self.env['ir.config_parameter'].sudo().get_param(
+            'coworking.pending_booking_ttl_hours', DEFAULT_PENDING_TTL_HOURS,
+        ))
+        now = fields.Datetime.now()
+        transitions = [
+            ('confirmed', 'completed', "end_date <= %(now)s", {'now': now}),
+            ('pending', 'cancelled', "create_date <= %(limit_date)s",
+             {'limit_date': now - timedelta(hours=ttl_hours)}),
+        ]
+        self.env['workspace.booking.tombstone']._purge()
+        expired = self.env['workspace.waitlist']._expire_stale()
+        if auto_commit:
+            self.env.cr.commit()
+        _logger.info("Booking lifecycle: %s waitlist entr(ies) expired", expired)
+        for from_status, to_status, condition, params in transitions:
+            started = time.monotonic()
+            total = 0
+            while True:
+                bookings = self._transition_batch(from_status, to_status, condition, params, batch_size)
+                total += len(bookings)
+                if auto_commit:
+                    self.env.cr.commit()
+                if len(bookings) < batch_size:
+                    break
+            _logger.info(
+                "Booking lifecycle: %s booking(s) %s -> %s in %.2fs",
+                total, from_status, to_status, time.monotonic() - started,
+            )
+
     def action_complete(self):
         """Marque la réservation comme terminée"""
         self.status = 'completed'
@@ -0,0 +1,131 @@
+import logging
+
+from odoo import models, fields, api, tools
+
+_logger = logging.getLogger(__name__)
+
+# Nombre de jours recalculés par requête lors du rafraîchissement
+REFRESH_BATCH_DAYS = 60
+
+
+class WorkspaceOccupancyReport(models.Model):
+    _name = 'workspace.occupancy.report'
+    _description = 'Workspace Occupancy Report'
+    _auto = False
+    _order = 'day desc, space_id'
+
+    day = fields.Date(string='Day', readonly=True)
+    space_id = fields.Many2one('workspace.space', string='Space', readonly=True)
+    space_type_id = fields.Many2one('workspace.type', string='Space Type', readonly=True)
+    booking_count = fields.Integer(string='Bookings', readonly=True)
+    booked_hours = fields.Float(string='Occupied Hours', readonly=True)
+    utilization = fields.Float(string='Utilization (%)', group_operator='avg', readonly=True)
+    revenue = fields.Float(string='Revenue', digits=(16, 2), readonly=True)
+
+    def init(self):
+        # Agrégat matérialisé : une ligne par espace et par jour (UTC), tenue à jour par le cron
+        self.env.cr.execute("""
+            CREATE TABLE IF NOT EXISTS workspace_occupancy_report (
+                id serial PRIMARY KEY,
+                day date NOT NULL,
+                space_id integer NOT NULL REFERENCES workspace_space(id) ON DELETE CASCADE,
+                space_type_id integer,
+                booking_count integer NOT NULL DEFAULT 0,
+                booked_hours double precision NOT NULL DEFAULT 0,
+                utilization double precision NOT NULL DEFAULT 0,
+                revenue double precision NOT NULL DEFAULT 0,
+                UNIQUE (day, space_id)
+            );
+            CREATE TABLE IF NOT EXISTS workspace_occupancy_report_dirty (
+                day date NOT NULL
+            );
+        """)
+        # Journal en ajout seul : sans clé unique, deux transactions qui touchent le même
+        # jour n'entrent pas en conflit ; les doublons sont fusionnés par le cron.
+        self.env.cr.execute("""
+            ALTER TABLE workspace_occupancy_report_dirty
+                DROP CONSTRAINT IF EXISTS workspace_occupancy_report_dirty_pkey
+        """)
+        tools.create_index(
+            self.env.cr, 'workspace_occupancy_report_dirty_day_idx', 'workspace_occupancy_report_dirty', ['day'],
+        )
+        self.env.cr.execute("SELECT 1 FROM workspace_occupancy_report LIMIT 1")
+        if not self.env.cr.rowcount:
+            self._mark_all_dirty()
+
+    @api.model
+    def _mark_all_dirty(self):
+        """Planifie la reconstruction complète du rapport"""
+        self.env['workspace.booking'].flush_model(['start_date', 'end_date'])
+        self.env.cr.execute("""
+            INSERT INTO workspace_occupancy_report_dirty (day)
+            SELECT generate_series(min(start_date)::date, max(end_date)::date, interval '1 day')::date
+              FROM (
+                    SELECT start_date, end_date FROM workspace_booking
+                     UNION ALL
+                    SELECT start_date, end_date FROM workspace_booking_archive
+                   ) b
+            HAVING min(start_date) IS NOT NULL
+        """)
+
+    @api.model
+    def _refresh_days(self, days):
+        """Recalcule entièrement les jours donnés, pour tous les espaces"""
+        self.env.cr.execute("DELETE FROM workspace_occupancy_report WHERE day = ANY(%s::date[])", [days])
+        self.env.cr.execute("""
+            INSERT INTO workspace_occupancy_report
+                   (day, space_id, space_type_id, booking_count, booked_hours, utilization, revenue)
+            SELECT d.day, s.id, s.space_type_id,
+                   count(b.start_date),
+                   COALESCE(sum(o.hours), 0),
+                   COALESCE(sum(o.hours), 0) / 24.0 * 100,
+                   COALESCE(sum(
+                       CASE WHEN b.status IN ('confirmed', 'completed')
+                            THEN b.total_price * o.hours
+                                 / (EXTRACT(EPOCH FROM b.end_date - b.start_date) / 3600)
+                       END
+                   ), 0)
+              FROM unnest(%s::date[]) AS d(day)
+        CROSS JOIN workspace_space s
+         LEFT JOIN (
+                SELECT space_id, status, start_date, end_date, total_price FROM workspace_booking
+                 UNION ALL
+                SELECT space_id, status, start_date, end_date, total_price FROM workspace_booking_archive
+               ) b
+                ON b.space_id = s.id
+               AND b.status IS DISTINCT FROM 'cancelled'
+               AND b.end_date > b.start_date
+               AND tsrange(b.start_date, b.end_date)
+                   && tsrange(d.day::timestamp, d.day::timestamp + interval '1 day')
+         LEFT JOIN LATERAL (
+                SELECT EXTRACT(EPOCH FROM LEAST(b.end_date, d.day::timestamp + interval '1 day')
+                                          - GREATEST(b.start_date, d.day::timestamp)) / 3600 AS hours
+               ) o ON TRUE
+          GROUP BY d.day, s.id, s.space_type_id
+        """, [days])
+
+    @api.model
+    def _cron_refresh(self):
+        """Rafraîchit uniquement les jours touchés par des réservations modifiées"""
+        self.env.flush_all()
+        refreshed = 0
+        while True:
+            # Les marques arrivées après l'instantané restent en table pour le passage suivant
+            self.env.cr.execute("""
+                WITH batch AS (
+                    SELECT DISTINCT day FROM workspace_occupancy_report_dirty
+                     ORDER BY day LIMIT %s
+                )
+                DELETE FROM workspace_occupancy_report_dirty d
+                 USING batch
+                 WHERE d.day = batch.day
+             RETURNING d.day
+            """, [REFRESH_BATCH_DAYS])
+            days = sorted({row[0] for row in self.env.cr.fetchall()})
+            if not days:
+                break
+            self._refresh_days(days)
+            refreshed += len(days)
+        if refreshed:
+            _logger.info("Occupancy report: %s day(s) refreshed", refreshed)
+        self.env.invalidate_all()
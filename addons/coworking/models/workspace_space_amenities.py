@@ -1,4 +1,4 @@
-from odoo import models, fields
+from odoo import models, fields, api
 
 class WorkspaceSpaceAmenity(models.Model):
     _name = 'workspace.space.amenity'
@@ -7,4 +7,23 @@ class WorkspaceSpaceAmenity(models.Model):
 
     space_id = fields.Many2one('workspace.space', string='Space', required=True)
     amenity_id = fields.Many2one('workspace.amenity', string='Amenity', required=True)
-    quantity = fields.Integer(string='Quantity', default=1)
\ No newline at end of file
+    quantity = fields.Integer(string='Quantity', default=1)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines.space_id._update_amenity_signature()
+        return lines
+
+    def write(self, vals):
+        spaces = self.space_id
+        res = super().write(vals)
+        if {'space_id', 'amenity_id', 'quantity'} & vals.keys():
+            (spaces | self.space_id)._update_amenity_signature()
+        return res
+
+    def unlink(self):
+        spaces = self.space_id
+        res = super().unlink()
+        spaces._update_amenity_signature()
+        return res
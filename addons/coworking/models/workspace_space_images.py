@@ -0,0 +1,11 @@
+from odoo import models, fields
+
+class WorkspaceSpaceImage(models.Model):
+    _name = 'workspace.space.image'
+    _description = 'Workspace Space Image'
+    _inherit = ['image.mixin']
+    _order = 'sequence, id'
+
+    name = fields.Char(string='Name')
+    sequence = fields.Integer(string='Sequence', default=10)
+    space_id = fields.Many2one('workspace.space', string='Space', required=True, ondelete='cascade', index=True)
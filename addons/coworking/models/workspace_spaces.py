@@ -1,10 +1,16 @@
-from odoo import models, fields, api
-from odoo.exceptions import ValidationError
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError, UserError
+from odoo.osv import expression
+
+from .workspace_bookings import booking_duration_error
 
 class WorkspaceSpace(models.Model):
     _name = 'workspace.space'
     _description = 'Workspace Space'
+    _inherit = ['image.mixin', 'coworking.calendar.feed.mixin']
     _order = 'name'
+    _calendar_route = 'space'
+    _calendar_feed_field = 'space_id'
 
     name = fields.Char(string='Name', required=True)
     space_type_id = fields.Many2one('workspace.type', string='Space Type', required=True)
@@ -16,7 +22,9 @@ class WorkspaceSpace(models.Model):
     monthly_rate = fields.Float(string='Monthly Rate', digits=(16, 2))
     description = fields.Text(string='Description')
     is_active = fields.Boolean(string='Active', default=True)
-    photos = fields.Binary(string='Photos')
+    # Photo principale : image_1920 et ses miniatures (image_128...) sont des pièces jointes
+    # redimensionnées une seule fois à l'enregistrement, jamais chargées par le prefetch
+    space_image_ids = fields.One2many('workspace.space.image', 'space_id', string='Photos')
     amenity_ids = fields.Many2many(
         'workspace.amenity',
         'workspace_space_amenity_rel',
@@ -24,6 +32,97 @@ class WorkspaceSpace(models.Model):
         'amenity_id',
         string='Amenities'
     )
+    # Filtres d'équipements (tous / au moins un) résolus sur la colonne amenity_signature
+    has_all_amenity_ids = fields.Many2many(
+        'workspace.amenity', string='Has All Amenities',
+        compute='_compute_amenity_filters', search='_search_has_all_amenity_ids',
+    )
+    has_any_amenity_ids = fields.Many2many(
+        'workspace.amenity', string='Has Any Amenity',
+        compute='_compute_amenity_filters', search='_search_has_any_amenity_ids',
+    )
+
+    def init(self):
+        # Signature d'équipements : tableau trié des ids issus de amenity_ids et de
+        # workspace.space.amenity, indexé en GIN pour @> (tous) et && (au moins un)
+        # (pas de champ ORM pour un tableau d'entiers : la colonne est gérée ici)
+        if not tools.column_exists(self.env.cr, self._table, 'amenity_signature'):
+            tools.create_column(
+                self.env.cr, self._table, 'amenity_signature', "integer[] NOT NULL DEFAULT '{}'",
+                comment='Sorted amenity ids of the space',
+            )
+            self.env.cr.execute("SELECT id FROM workspace_space")
+            self.browse([row[0] for row in self.env.cr.fetchall()])._update_amenity_signature()
+        tools.create_index(
+            self.env.cr, 'workspace_space_amenity_signature_idx', self._table,
+            ['amenity_signature'], method='gin',
+        )
+
+    def _update_amenity_signature(self):
+        """Recalcule en un UPDATE la signature d'équipements des espaces"""
+        if not self.ids:
+            return
+        self.flush_model(['amenity_ids'])
+        self.env['workspace.space.amenity'].flush_model(['space_id', 'amenity_id', 'quantity'])
+        self.env.cr.execute("""
+            UPDATE workspace_space s
+               SET amenity_signature = COALESCE((
+                       SELECT array_agg(a.amenity_id ORDER BY a.amenity_id)
+                         FROM (
+                               SELECT r.amenity_id FROM workspace_space_amenity_rel r
+                                WHERE r.space_id = s.id
+                                UNION
+                               SELECT q.amenity_id FROM workspace_space_amenity q
+                                WHERE q.space_id = s.id AND q.quantity > 0
+                              ) a
+                   ), '{}')
+             WHERE s.id = ANY(%s)
+        """, [self.ids])
+
+    def _compute_amenity_filters(self):
+        self.has_all_amenity_ids = False
+        self.has_any_amenity_ids = False
+
+    def _amenity_signature_domain(self, operator, value, sql_operator):
+        if operator in ('ilike', '=ilike'):
+            # Texte libre de la barre de recherche : au moins un équipement dont le nom correspond
+            amenity_ids = self.env['workspace.amenity'].search([('name', operator, value)]).ids
+            if not amenity_ids:
+                return expression.FALSE_DOMAIN
+            sql_operator = '&&'
+        elif operator not in ('in', '='):
+            raise UserError(f" Unsupported operator '{operator}' for amenity filters.")
+        elif not value or isinstance(value, bool):
+            # Aucun équipement demandé : le filtre ne retient rien plutôt que tout
+            return expression.FALSE_DOMAIN
+        else:
+            amenity_ids = {value} if isinstance(value, int) else set(value)
+        amenity_ids = sorted(amenity_ids)
+        query = self._search([])
+        query.add_where(f'"{query.table}".amenity_signature {sql_operator} %s::int[]', [amenity_ids])
+        return [('id', 'in', query)]
+
+    def _search_has_all_amenity_ids(self, operator, value):
+        return self._amenity_signature_domain(operator, value, '@>')
+
+    def _search_has_any_amenity_ids(self, operator, value):
+        return self._amenity_signature_domain(operator, value, '&&')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        spaces = super().create(vals_list)
+        spaces._update_amenity_signature()
+        return spaces
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'amenity_ids' in vals:
+            self._update_amenity_signature()
+        if 'name' in vals:
+            self.env['workspace.booking']._propagate_names('space_id', self.ids)
+            series = self.env['workspace.booking.series'].search([('space_id', 'in', self.ids)])
+            self.env.add_to_compute(series._fields['name'], series)
+        return res
 
     @api.constrains('name')
     def _check_name(self):
@@ -60,3 +159,145 @@ class WorkspaceSpace(models.Model):
             if space.daily_rate > 0 and space.monthly_rate > 0:
                 if space.monthly_rate > space.daily_rate * 31:
                     raise ValidationError(" Monthly rate seems too high compared to daily rate.")
+
+    @api.model
+    def search_available(self, start_date, end_date, capacity=0, space_type_id=False, amenity_ids=None, limit=None):
+        """Espaces actifs libres sur [start_date, end_date), triés par prix
+
+        Le prix retenu est le moins cher des tarifs horaire, journalier et mensuel
+        dont les bornes de durée admettent la fenêtre demandée (une heure n'est
+        jamais tarifée au prorata d'un mois). Tout est résolu en une seule requête SQL
+        (anti-jointure sur les réservations et les blocages, signature d'équipements indexée).
+        """
+        self.check_access_rights('read')
+        start_date = fields.Datetime.to_datetime(start_date)
+        end_date = fields.Datetime.to_datetime(end_date)
+        if not start_date or not end_date or start_date >= end_date:
+            raise ValidationError(" End date must be strictly after start date.")
+        amenity_ids = sorted(set(amenity_ids or []))
+        hours = (end_date - start_date).total_seconds() / 3600
+        durations = {'hourly': hours, 'daily': hours / 24, 'monthly': hours / 24 / 30}
+        # Un tarif n'entre dans le prix que si la fenêtre est une durée réservable pour son type
+        prices = [
+            f"CASE WHEN s.{booking_type}_rate > 0 THEN s.{booking_type}_rate * %({booking_type})s END"
+            for booking_type, duration in durations.items()
+            if not booking_duration_error(booking_type, duration)
+        ]
+        price = f"LEAST({', '.join(prices)})" if prices else "NULL::float"
+
+        self.env['workspace.booking'].flush_model(['space_id', 'start_date', 'end_date', 'status'])
+        self.flush_model(['is_active', 'capacity', 'space_type_id', 'hourly_rate', 'daily_rate', 'monthly_rate'])
+        conditions = ["s.is_active", "s.capacity >= %(capacity)s"]
+        if space_type_id:
+            conditions.append("s.space_type_id = %(space_type_id)s")
+        if amenity_ids:
+            conditions.append("s.amenity_signature @> %(amenity_ids)s::int[]")
+        query = f"""
+            SELECT s.id, s.name, s.capacity, s.space_type_id,
+                   {price} AS price
+              FROM workspace_space s
+             WHERE {' AND '.join(conditions)}
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM workspace_booking b
+                    WHERE b.space_id = s.id
+                      AND b.status IS DISTINCT FROM 'cancelled'
+                      AND b.end_date > b.start_date
+                      AND tsrange(b.start_date, b.end_date) && tsrange(%(start)s, %(end)s)
+               )
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM workspace_booking_hold h
+                    WHERE h.space_id = s.id
+                      AND h.expires_at > (now() at time zone 'UTC')
+                      AND tsrange(h.start_date, h.end_date) && tsrange(%(start)s, %(end)s)
+               )
+          ORDER BY price NULLS LAST, s.name
+        """
+        params = {
+            'capacity': capacity or 0,
+            'space_type_id': space_type_id,
+            'amenity_ids': amenity_ids,
+            **durations,
+            'start': start_date,
+            'end': end_date,
+        }
+        if limit:
+            query += " LIMIT %(limit)s"
+            params['limit'] = limit
+        self.env.cr.execute(query, params)
+        return self.env.cr.dictfetchall()
+
+    def _reprice_bookings(self, dry_run=False):
+        """Recalcule en une requête le prix des réservations futures des espaces
+
+        Seules les réservations en attente ou confirmées qui n'ont pas encore commencé
+        sont concernées. En mode dry_run rien n'est écrit : on renvoie seulement
+        le nombre de réservations impactées et l'écart de prix total.
+        """
+        if not self:
+            return {'count': 0, 'delta': 0.0}
+        Booking = self.env['workspace.booking']
+        Booking.check_access_rights('write')
+        self.flush_model(['hourly_rate', 'daily_rate', 'monthly_rate'])
+        Booking.flush_model(['space_id', 'status', 'start_date', 'booking_type', 'duration_value', 'total_price'])
+        repriced = """
+            SELECT b.id, b.total_price AS old_price,
+                   b.duration_value * CASE b.booking_type
+                       WHEN 'hourly' THEN s.hourly_rate
+                       WHEN 'daily' THEN s.daily_rate
+                       WHEN 'monthly' THEN s.monthly_rate
+                   END AS new_price
+              FROM workspace_booking b
+              JOIN workspace_space s ON s.id = b.space_id
+             WHERE b.space_id = ANY(%(space_ids)s)
+               AND b.status IN ('pending', 'confirmed')
+               AND b.start_date >= %(now)s
+        """
+        params = {'space_ids': self.ids, 'now': fields.Datetime.now(), 'uid': self.env.uid}
+        if dry_run:
+            self.env.cr.execute(f"""
+                SELECT count(*), COALESCE(sum(p.new_price - COALESCE(p.old_price, 0)), 0)
+                  FROM ({repriced}) p
+                 WHERE p.new_price IS DISTINCT FROM p.old_price
+            """, params)
+            count, delta = self.env.cr.fetchone()
+            return {'count': count, 'delta': delta}
+
+        self.env.cr.execute(f"""
+            UPDATE workspace_booking b
+               SET total_price = p.new_price,
+                   write_uid = %(uid)s,
+                   write_date = (now() at time zone 'UTC')
+              FROM ({repriced}) p
+             WHERE b.id = p.id
+               AND p.new_price IS DISTINCT FROM p.old_price
+         RETURNING b.id, p.new_price - COALESCE(p.old_price, 0)
+        """, params)
+        rows = self.env.cr.fetchall()
+        bookings = Booking.browse([row[0] for row in rows])
+        Booking.invalidate_model(['total_price', 'write_uid', 'write_date'])
+        # Les agrégats stockés (statistiques clients) dépendent de total_price
+        bookings.modified(['total_price'])
+        bookings._mark_occupancy_dirty()
+        return {'count': len(rows), 'delta': sum(row[1] for row in rows)}
+
+    def _reprice_notification(self, title, result, notification_type):
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': title,
+                'message': f"{result['count']} booking(s), total change {result['delta']:+.2f}",
+                'sticky': False,
+                'type': notification_type,
+            }
+        }
+
+    def action_preview_reprice(self):
+        """Affiche l'impact d'une mise à jour des tarifs sans rien modifier"""
+        return self._reprice_notification('Repricing Preview', self._reprice_bookings(dry_run=True), 'info')
+
+    def action_reprice_bookings(self):
+        """Applique les tarifs actuels aux réservations futures"""
+        return self._reprice_notification('Bookings Repriced', self._reprice_bookings(), 'success')
@@ -0,0 +1,185 @@
+import logging
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError
+
+from .workspace_bookings import booking_end_date, booking_dates_error, booking_duration_error
+
+_logger = logging.getLogger(__name__)
+
+
+class WorkspaceWaitlist(models.Model):
+    _name = 'workspace.waitlist'
+    _description = 'Workspace Waitlist Entry'
+    _order = 'priority desc, id'
+
+    name = fields.Char(string='Name', compute='_compute_name', store=True)
+    space_id = fields.Many2one('workspace.space', string='Space', required=True, ondelete='cascade')
+    customer_id = fields.Many2one('coworking.customer', string='Customer', required=True, ondelete='cascade')
+    booking_type = fields.Selection([
+        ('hourly', 'Hourly'),
+        ('daily', 'Daily'),
+        ('monthly', 'Monthly')
+    ], string='Booking Type', required=True, default='hourly')
+    duration_value = fields.Float(string='Duration', default=1.0, required=True)
+    start_date = fields.Datetime(string='Start Date', required=True)
+    end_date = fields.Datetime(string='End Date', compute='_compute_end_date', store=True, precompute=True)
+    priority = fields.Integer(string='Priority', default=0, help="Higher priority entries are promoted first.")
+    state = fields.Selection([
+        ('waiting', 'Waiting'),
+        ('promoted', 'Promoted'),
+        ('expired', 'Expired'),
+        ('cancelled', 'Cancelled'),
+    ], string='State', default='waiting', required=True)
+    booking_id = fields.Many2one('workspace.booking', string='Booking', readonly=True, ondelete='set null')
+    promoted_date = fields.Datetime(string='Promoted On', readonly=True)
+
+    @api.depends('customer_id.name', 'space_id.name')
+    def _compute_name(self):
+        for entry in self:
+            entry.name = f"{entry.customer_id.name or ''} - {entry.space_id.name or ''}"
+
+    @api.depends('booking_type', 'duration_value', 'start_date')
+    def _compute_end_date(self):
+        for entry in self:
+            entry.end_date = booking_end_date(entry.booking_type, entry.start_date, entry.duration_value)
+
+    @api.constrains('start_date', 'end_date')
+    def _check_dates(self):
+        for entry in self:
+            error = booking_dates_error(entry.start_date, entry.end_date)
+            if error:
+                raise ValidationError(error)
+
+    @api.constrains('booking_type', 'duration_value')
+    def _check_duration(self):
+        for entry in self:
+            error = booking_duration_error(entry.booking_type, entry.duration_value)
+            if error:
+                raise ValidationError(error)
+
+    def init(self):
+        # Un créneau libéré ne consulte que les demandes en attente qui le chevauchent
+        self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        tools.create_index(
+            self.env.cr, 'workspace_waitlist_waiting_period_idx', self._table,
+            ['space_id', 'tsrange(start_date, end_date)'],
+            method='gist', where="state = 'waiting'",
+        )
+        # Expiration des demandes dont le créneau est passé
+        tools.create_index(
+            self.env.cr, 'workspace_waitlist_waiting_start_idx', self._table, ['start_date'],
+            where="state = 'waiting'",
+        )
+
+    @api.model
+    def _promote(self, freed):
+        """Promeut en réservations en attente les demandes qui tiennent dans les créneaux libérés
+
+        freed est une liste de (space_id, début, fin). Les espaces concernés sont
+        verrouillés comme pour une création de réservation. Une requête indexée par
+        créneau libéré retient les candidats sans conflit visible ; ils sont acceptés
+        par priorité décroissante tant qu'ils ne se chevauchent pas entre eux. Une
+        réservation validée pendant l'attente du verrou échappe à cette requête
+        (instantané REPEATABLE READ) : chaque promotion est donc créée sous son propre
+        savepoint, et une demande rejetée par la contrainte d'exclusion reste en
+        attente sans faire échouer l'annulation. Renvoie les réservations créées.
+        """
+        freed = [(space_id, start, end) for space_id, start, end in freed if space_id and start and end and start < end]
+        if not freed:
+            return self.env['workspace.booking']
+        Booking = self.env['workspace.booking']
+        Booking.flush_model(['space_id', 'start_date', 'end_date', 'status'])
+        self.flush_model(['space_id', 'start_date', 'end_date', 'state'])
+        space_ids, starts, ends = zip(*freed)
+        Booking._lock_spaces(space_ids)
+        self.env.cr.execute("""
+            SELECT w.id, w.space_id, w.start_date, w.end_date
+              FROM workspace_waitlist w
+             WHERE w.id IN (
+                   SELECT c.id
+                     FROM unnest(%(space_ids)s::int[], %(starts)s::timestamp[], %(ends)s::timestamp[])
+                          AS f(space_id, start_date, end_date)
+                     JOIN workspace_waitlist c
+                       ON c.space_id = f.space_id
+                      AND tsrange(c.start_date, c.end_date) && tsrange(f.start_date, f.end_date)
+                    WHERE c.state = 'waiting'
+                      AND c.start_date > %(now)s
+             )
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM workspace_booking b
+                    WHERE b.space_id = w.space_id
+                      AND tsrange(b.start_date, b.end_date) && tsrange(w.start_date, w.end_date)
+                      AND b.status IS DISTINCT FROM 'cancelled'
+                      AND b.end_date > b.start_date
+             )
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM workspace_booking_hold h
+                    WHERE h.space_id = w.space_id
+                      AND h.expires_at > (now() at time zone 'UTC')
+                      AND tsrange(h.start_date, h.end_date) && tsrange(w.start_date, w.end_date)
+             )
+             ORDER BY w.priority DESC, w.id
+               FOR UPDATE OF w SKIP LOCKED
+        """, {
+            'space_ids': list(space_ids),
+            'starts': list(starts),
+            'ends': list(ends),
+            'now': fields.Datetime.now(),
+        })
+        accepted = []
+        taken = {}
+        for entry_id, space_id, start, end in self.env.cr.fetchall():
+            if any(start < other_end and other_start < end for other_start, other_end in taken.get(space_id, ())):
+                continue
+            taken.setdefault(space_id, []).append((start, end))
+            accepted.append(entry_id)
+        if not accepted:
+            return Booking
+        now = fields.Datetime.now()
+        bookings = Booking
+        for entry in self.browse(accepted):
+            try:
+                with self.env.cr.savepoint():
+                    booking = Booking.with_context(skip_availability_batch=True).create({
+                        'space_id': entry.space_id.id,
+                        'customer_id': entry.customer_id.id,
+                        'booking_type': entry.booking_type,
+                        'duration_value': entry.duration_value,
+                        'start_date': entry.start_date,
+                        'end_date': entry.end_date,
+                        'status': 'pending',
+                        'notes': f"Promoted from waitlist #{entry.id}",
+                    })
+            except ValidationError:
+                _logger.info("Waitlist: entry #%s kept waiting, its slot was taken concurrently", entry.id)
+                continue
+            entry.write({'state': 'promoted', 'booking_id': booking.id, 'promoted_date': now})
+            bookings |= booking
+        _logger.info("Waitlist: %s entr(ies) promoted for %s freed slot(s)", len(bookings), len(freed))
+        return bookings
+
+    @api.model
+    def _expire_stale(self):
+        """Expire les demandes dont le créneau a commencé"""
+        self.flush_model(['state', 'start_date'])
+        self.env.cr.execute("""
+            UPDATE workspace_waitlist
+               SET state = 'expired',
+                   write_uid = %s,
+                   write_date = (now() at time zone 'UTC')
+             WHERE state = 'waiting'
+               AND start_date <= %s
+        """, [self.env.uid, fields.Datetime.now()])
+        self.invalidate_model(['state', 'write_uid', 'write_date'])
+        return self.env.cr.rowcount
+
+    def action_cancel(self):
+        """Retire la demande de la liste d'attente"""
+        self.filtered(lambda entry: entry.state == 'waiting').state = 'cancelled'
+
+    def action_promote(self):
+        """Tente immédiatement de promouvoir la demande si son créneau est libre"""
+        self._promote([(entry.space_id.id, entry.start_date, entry.end_date) for entry in self if entry.state == 'waiting'])
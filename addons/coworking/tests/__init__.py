@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+
+from . import test_booking_concurrency
+from . import test_booking_feed
+from . import test_booking_hold
+from . import test_booking_ics
+from . import test_booking_import
+from . import test_booking_query_plans
+from . import test_booking_series
+from . import test_library_items
+from . import test_perf_stat
+from . import test_performance
+from . import test_workspace_occupancy_report
+from . import test_workspace_space
+from . import test_workspace_waitlist
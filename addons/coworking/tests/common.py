@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase
+
+
+class CoworkingCase(TransactionCase):
+    """Deux espaces et un client, pour des réservations à venir"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.space_type = cls.env['workspace.type'].create({'name': 'Meeting Room', 'code': 'MR'})
+        cls.spaces = cls.env['workspace.space'].create([
+            {'name': f'Room {i}', 'space_type_id': cls.space_type.id, 'capacity': 4,
+             'hourly_rate': 10, 'daily_rate': 60, 'monthly_rate': 1200}
+            for i in range(2)
+        ])
+        cls.customer = cls.env['coworking.customer'].create({'name': 'Customer', 'email': 'customer@example.com'})
+        cls.start = fields.Datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=7)
+
+    def book(self, space, hours=0, duration=1, **vals):
+        """Réservation horaire sur space, hours heures après cls.start"""
+        return self.env['workspace.booking'].create(dict({
+            'space_id': space.id,
+            'customer_id': self.customer.id,
+            'booking_type': 'hourly',
+            'duration_value': duration,
+            'start_date': self.start + timedelta(hours=hours),
+        }, **vals))
+
+
+class CoworkingSeedCase(TransactionCase):
+    """Jeu de données volumineux inséré en SQL, bien plus vite qu'avec l'ORM"""
+
+    SPACES = 20
+    CUSTOMERS = 200
+    BOOKINGS = 50000
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.space_type = cls.env['workspace.type'].create({'name': 'Meeting Room', 'code': 'MR'})
+        cls.spaces = cls.env['workspace.space'].create([
+            {'name': f'Room {i}', 'space_type_id': cls.space_type.id, 'capacity': 4,
+             'hourly_rate': 10, 'daily_rate': 60, 'monthly_rate': 1200}
+            for i in range(cls.SPACES)
+        ])
+        cls.customers = cls.env['coworking.customer'].create([
+            {'name': f'Customer {i}', 'email': f'customer{i}@example.com'} for i in range(cls.CUSTOMERS)
+        ])
+        cls.env.flush_all()
+
+        # Un créneau d'une heure toutes les deux heures par espace, sans chevauchement,
+        # qui se termine au moment présent : l'essentiel de l'historique est passé.
+        slots = cls.BOOKINGS // cls.SPACES
+        cls.now = fields.Datetime.now().replace(minute=0, second=0, microsecond=0)
+        cls.base = cls.now - timedelta(hours=2 * slots)
+        cls.env.cr.execute("""
+            INSERT INTO workspace_booking
+                   (space_id, customer_id, booking_type, duration_value,
+                    start_date, end_date, total_price, status, name, create_date, write_date)
+            SELECT (%(spaces)s::int[])[1 + n %% %(space_count)s],
+                   (%(customers)s::int[])[1 + n %% %(customer_count)s],
+                   'hourly', 1,
+                   %(base)s + (n / %(space_count)s) * interval '2 hours',
+                   %(base)s + (n / %(space_count)s) * interval '2 hours' + interval '1 hour',
+                   10,
+                   (ARRAY['pending', 'confirmed', 'completed', 'cancelled'])[1 + n %% 4],
+                   'Seed booking',
+                   %(now)s, %(now)s
+              FROM generate_series(0, %(count)s - 1) AS n
+        """, {
+            'spaces': cls.spaces.ids,
+            'space_count': cls.SPACES,
+            'customers': cls.customers.ids,
+            'customer_count': cls.CUSTOMERS,
+            'base': cls.base,
+            'now': cls.now,
+            'count': cls.BOOKINGS,
+        })
+        cls.env.cr.execute("ANALYZE workspace_booking")
+        # Les agrégats clients stockés doivent refléter les lignes insérées en SQL
+        cls.customers.modified(['booking_ids'])
+        cls.env.flush_all()
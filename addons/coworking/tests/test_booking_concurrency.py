@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+import os
+import random
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from psycopg2 import errors
+
+from odoo import api, fields, sql_db, SUPERUSER_ID
+from odoo.exceptions import ValidationError
+from odoo.tests import BaseCase, tagged
+from odoo.tests.common import get_db_name
+
+# Charge : COWORKING_STRESS_WORKERS transactions concurrentes, chacune COWORKING_STRESS_ATTEMPTS fois
+WORKERS = int(os.environ.get('COWORKING_STRESS_WORKERS', 8))
+ATTEMPTS = int(os.environ.get('COWORKING_STRESS_ATTEMPTS', 25))
+# Créneaux d'une heure disputés par espace
+SLOTS = 6
+# Nouvelles tentatives sur erreur de sérialisation ou interblocage : comptées, le test n'en tolère aucune
+MAX_RETRIES = 3
+
+
+@tagged('coworking_stress', '-standard')
+class TestBookingConcurrency(BaseCase):
+    """Transactions réellement concurrentes, sur des connexions indépendantes
+
+    Les données sont validées (commit) puis supprimées : ce test tourne hors de la
+    suite standard, sur une base locale (--test-tags coworking_stress).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db = sql_db.db_connect(get_db_name())
+        with cls.transaction() as env:
+            space_type = env['workspace.type'].create({'name': 'Stress Room', 'code': 'STRESS'})
+            spaces = env['workspace.space'].create([
+                {'name': f'Stress Room {i}', 'space_type_id': space_type.id, 'capacity': 4,
+                 'hourly_rate': 10, 'daily_rate': 60, 'monthly_rate': 1200}
+                for i in range(2 + WORKERS)
+            ])
+            # Un client par worker : les statistiques stockées du client sont mises à jour
+            # à chaque réservation, un client commun ferait se heurter toutes les transactions
+            customers = env['coworking.customer'].create([
+                {'name': f'Stress Customer {i}', 'email': f'stress{i}@example.com'} for i in range(WORKERS)
+            ])
+            cls.space_type_id, cls.customer_ids = space_type.id, customers.ids
+            # Deux espaces disputés par tous les workers, puis un espace propre à chaque worker
+            cls.space_ids, cls.own_space_ids = spaces.ids[:2], spaces.ids[2:]
+        cls.start = fields.Datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=365)
+
+    @classmethod
+    def tearDownClass(cls):
+        with cls.transaction() as env:
+            space_ids = cls.space_ids + cls.own_space_ids
+            env['workspace.booking'].search([('space_id', 'in', space_ids)]).unlink()
+            env['workspace.space'].browse(space_ids).unlink()
+            env['coworking.customer'].browse(cls.customer_ids).unlink()
+            env['workspace.type'].browse(cls.space_type_id).unlink()
+        super().tearDownClass()
+
+    @classmethod
+    @contextmanager
+    def transaction(cls):
+        """Une transaction sur sa propre connexion, validée en sortie de bloc"""
+        with cls.db.cursor() as cr:
+            yield api.Environment(cr, SUPERUSER_ID, {})
+
+    def _book(self, space_id, customer_id, slot, stats):
+        for _attempt in range(MAX_RETRIES + 1):
+            try:
+                with self.transaction() as env:
+                    env['workspace.booking'].create({
+                        'space_id': space_id,
+                        'customer_id': customer_id,
+                        'booking_type': 'hourly',
+                        'duration_value': 1,
+                        'start_date': self.start + timedelta(hours=slot),
+                    })
+                stats['created'] += 1
+                return
+            except ValidationError:
+                stats['rejected'] += 1
+                return
+            except (errors.SerializationFailure, errors.DeadlockDetected):
+                stats['retries'] += 1
+        stats['failed'] += 1
+
+    def _worker(self, seed, stats, barrier):
+        rng = random.Random(seed)
+        barrier.wait()
+        for _attempt in range(ATTEMPTS):
+            self._book(rng.choice(self.space_ids), self.customer_ids[seed], rng.randrange(SLOTS), stats)
+
+    def _own_space_worker(self, seed, stats, barrier):
+        barrier.wait()
+        for slot in range(ATTEMPTS):
+            self._book(self.own_space_ids[seed], self.customer_ids[seed], slot, stats)
+
+    def _run_workers(self, target):
+        """Lance WORKERS threads simultanément et renvoie le cumul de leurs compteurs"""
+        barrier = threading.Barrier(WORKERS)
+        stats = [dict(created=0, rejected=0, retries=0, failed=0) for _worker in range(WORKERS)]
+        threads = [
+            threading.Thread(target=target, args=(seed, stats[seed], barrier))
+            for seed in range(WORKERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {key: sum(worker[key] for worker in stats) for key in stats[0]}
+
+    def test_concurrent_creates(self):
+        totals = self._run_workers(self._worker)
+
+        with self.transaction() as env:
+            env.cr.execute("""
+                SELECT count(*)
+                  FROM workspace_booking a
+                  JOIN workspace_booking b
+                    ON a.space_id = b.space_id
+                   AND a.id < b.id
+                   AND tsrange(a.start_date, a.end_date) && tsrange(b.start_date, b.end_date)
+                 WHERE a.space_id = ANY(%s)
+                   AND a.status IS DISTINCT FROM 'cancelled'
+                   AND b.status IS DISTINCT FROM 'cancelled'
+            """, [self.space_ids])
+            overlaps = env.cr.fetchone()[0]
+            booked = env['workspace.booking'].search_count([
+                ('space_id', 'in', self.space_ids),
+                ('start_date', '<', self.start + timedelta(hours=SLOTS)),
+            ])
+
+        self.assertEqual(overlaps, 0, totals)
+        self.assertEqual(totals['failed'], 0, totals)
+        self.assertEqual(totals['created'], booked, totals)
+        self.assertEqual(booked, min(len(self.space_ids) * SLOTS, WORKERS * ATTEMPTS), totals)
+        self.assertEqual(totals['created'] + totals['rejected'], WORKERS * ATTEMPTS, totals)
+        # Un créneau pris par une transaction concurrente est rejeté par la contrainte
+        # d'exclusion (ValidationError), jamais par une erreur de sérialisation
+        self.assertEqual(totals['retries'], 0, totals)
+
+    def test_different_spaces_never_retry(self):
+        """Des réservations sur des espaces distincts ne partagent aucune ligne écrite"""
+        totals = self._run_workers(self._own_space_worker)
+        self.assertEqual(totals, dict(created=WORKERS * ATTEMPTS, rejected=0, retries=0, failed=0))
+
+    def test_other_space_not_blocked(self):
+        """Un verrou tenu sur un espace ne retarde pas les réservations d'un autre"""
+        with self.transaction() as holder:
+            holder['workspace.booking']._lock_spaces(self.space_ids[:1])
+            with self.transaction() as env:
+                env.cr.execute("SET LOCAL lock_timeout = '1s'")
+                env['workspace.booking'].create({
+                    'space_id': self.space_ids[1],
+                    'customer_id': self.customer_ids[0],
+                    'booking_type': 'hourly',
+                    'duration_value': 1,
+                    'start_date': self.start + timedelta(days=1),
+                })
+            with self.assertRaises(errors.LockNotAvailable):
+                with self.transaction() as env:
+                    env.cr.execute("SET LOCAL lock_timeout = '100ms'")
+                    env['workspace.booking']._lock_spaces(self.space_ids[:1])
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from odoo import fields
+from odoo.tests import HttpCase, new_test_user, tagged
+
+from .common import CoworkingCase
+
+
+@tagged('post_install', '-at_install')
+class TestBookingFeed(CoworkingCase, HttpCase):
+    """Flux JSON des réservations interrogé en boucle par les calendriers"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        new_test_user(cls.env, login='feed_user', groups='base.group_user')
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate('feed_user', 'feed_user')
+
+    def _feed(self, space_ids=None, start_date=None, end_date=None, etag=None):
+        params = {
+            'space_ids': ','.join(map(str, self.spaces.ids)) if space_ids is None else space_ids,
+            'start_date': start_date or fields.Datetime.to_string(self.start),
+            'end_date': end_date or fields.Datetime.to_string(self.start + timedelta(days=1)),
+        }
+        headers = {'If-None-Match': etag} if etag else {}
+        return self.url_open(f'/coworking/bookings/feed?{urlencode(params)}', headers=headers)
+
+    def test_bad_parameters(self):
+        self.assertEqual(self._feed(space_ids='1,abc').status_code, 400)
+        self.assertEqual(self._feed(start_date='tomorrow').status_code, 400)
+        self.assertEqual(self._feed(end_date=fields.Datetime.to_string(self.start)).status_code, 400)
+
+    def test_etag_revalidation(self):
+        booking = self.book(self.spaces[0])
+        response = self._feed()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry['id'] for entry in response.json()['bookings']], [booking.id])
+        etag = response.headers['ETag']
+
+        response = self._feed(etag=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+
+        # Nouvelle réservation dans la fenêtre : le validateur change
+        self.book(self.spaces[1], hours=2)
+        response = self._feed(etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        self.assertEqual(len(response.json()['bookings']), 2)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from psycopg2 import IntegrityError
+
+from odoo import fields
+from odoo.exceptions import AccessError, ValidationError
+from odoo.tests import new_test_user, tagged
+from odoo.tools import mute_logger
+
+from .common import CoworkingCase
+
+
+@tagged('post_install', '-at_install')
+class TestBookingHold(CoworkingCase):
+    """Blocages temporaires de créneaux pour le paiement en ligne"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = new_test_user(cls.env, login='hold_user', groups='base.group_user')
+        cls.other_user = new_test_user(cls.env, login='hold_other_user', groups='base.group_user')
+        cls.Hold = cls.env['workspace.booking.hold'].with_user(cls.user)
+
+    def _place(self, space, hours=0, duration=1, Hold=None, **kwargs):
+        hold = (Hold or self.Hold).place_hold(
+            space.id, fields.Datetime.to_string(self.start + timedelta(hours=hours)), 'hourly', duration, **kwargs,
+        )
+        return (Hold or self.Hold).browse(hold['id'])
+
+    def _expire(self, holds):
+        self.env.cr.execute(
+            "UPDATE workspace_booking_hold SET expires_at = (now() at time zone 'UTC') - interval '1 minute'"
+            " WHERE id = ANY(%s)", [holds.ids],
+        )
+        holds.invalidate_recordset()
+
+    def test_place_blocks_the_slot(self):
+        hold = self._place(self.spaces[0], duration=2)
+        self.assertGreater(hold.expires_at, fields.Datetime.now())
+        with self.assertRaises(ValidationError):
+            self._place(self.spaces[0], hours=1)
+        with self.assertRaises(ValidationError):
+            self.book(self.spaces[0], hours=1)
+        # Autre espace, ou créneau adjacent : libres
+        self._place(self.spaces[1], hours=1)
+        self._place(self.spaces[0], hours=2)
+
+    def test_overlap_enforced_by_database(self):
+        """Un blocage concurrent invisible dans l'instantané est refusé par la contrainte"""
+        self._place(self.spaces[0], duration=2)
+        with self.assertRaises(IntegrityError), mute_logger('odoo.sql_db'):
+            with self.env.cr.savepoint():
+                self.env['workspace.booking.hold'].create({
+                    'space_id': self.spaces[0].id,
+                    'booking_type': 'hourly',
+                    'duration_value': 1,
+                    'start_date': self.start + timedelta(hours=1),
+                    'end_date': self.start + timedelta(hours=2),
+                    'expires_at': fields.Datetime.now() + timedelta(minutes=10),
+                })
+
+    def test_held_slot_reported_as_held(self):
+        self._place(self.spaces[0])
+        with self.assertRaisesRegex(ValidationError, 'temporarily held'):
+            self.book(self.spaces[0])
+        # Un lot déjà validé par l'appelant reste confronté aux blocages
+        with self.assertRaisesRegex(ValidationError, 'temporarily held'):
+            self.env['workspace.booking'].with_context(skip_availability_batch=True).create({
+                'space_id': self.spaces[0].id,
+                'customer_id': self.customer.id,
+                'booking_type': 'hourly',
+                'duration_value': 1,
+                'start_date': self.start,
+            })
+
+    def test_move_or_reactivate_onto_hold(self):
+        moved = self.book(self.spaces[1])
+        cancelled = self.book(self.spaces[0], hours=2, status='cancelled')
+        self._place(self.spaces[0], duration=3)
+        with self.assertRaisesRegex(ValidationError, 'temporarily held'), self.env.cr.savepoint():
+            moved.space_id = self.spaces[0]
+        with self.assertRaisesRegex(ValidationError, 'temporarily held'), self.env.cr.savepoint():
+            cancelled.status = 'pending'
+        self.assertEqual((moved.space_id, cancelled.status), (self.spaces[1], 'cancelled'))
+        # Hors du blocage, les mêmes modifications passent
+        moved.start_date = self.start + timedelta(hours=3)
+        moved.space_id = self.spaces[0]
+        self.assertEqual(moved.space_id, self.spaces[0])
+
+    def test_release_restricted_to_owner(self):
+        hold = self._place(self.spaces[0])
+        with self.assertRaises(AccessError):
+            hold.with_user(self.other_user).action_release()
+        self.assertTrue(hold.exists())
+        hold.action_release()
+        self.assertFalse(hold.exists())
+
+    def test_place_over_booking(self):
+        self.book(self.spaces[0])
+        with self.assertRaises(ValidationError):
+            self._place(self.spaces[0])
+
+    def test_expired_hold_frees_the_slot(self):
+        hold = self._place(self.spaces[0])
+        self._expire(hold)
+        replacement = self._place(self.spaces[0], Hold=self.env['workspace.booking.hold'].with_user(self.other_user))
+        self.assertFalse(hold.exists())
+        self.assertTrue(replacement.exists())
+
+    def test_promote(self):
+        hold = self._place(self.spaces[0], duration=2, customer_id=self.customer.id)
+        booking = hold.promote(notes='Paid online')
+        self.assertFalse(hold.exists())
+        self.assertEqual(booking.status, 'pending')
+        self.assertEqual(booking.customer_id, self.customer)
+        self.assertEqual(booking.notes, 'Paid online')
+        self.assertEqual((booking.start_date, booking.end_date), (self.start, self.start + timedelta(hours=2)))
+
+    def test_promote_restricted_to_owner_and_customer(self):
+        hold = self._place(self.spaces[0], customer_id=self.customer.id)
+        with self.assertRaises(AccessError):
+            hold.with_user(self.other_user).promote()
+        other_customer = self.env['coworking.customer'].create({'name': 'Other', 'email': 'other@example.com'})
+        with self.assertRaises(ValidationError):
+            hold.promote(other_customer.id)
+        self.assertTrue(hold.exists())
+        self.assertEqual(hold.promote(self.customer.id).customer_id, self.customer)
+
+    def test_promote_expired_or_swept(self):
+        hold = self._place(self.spaces[0])
+        self._expire(hold)
+        with self.assertRaisesRegex(ValidationError, 'expired'):
+            hold.promote(self.customer.id)
+        self.env['workspace.booking.hold']._cron_sweep()
+        self.assertFalse(hold.exists())
+        with self.assertRaisesRegex(ValidationError, 'expired'):
+            hold.promote(self.customer.id)
+
+    def test_sweep_keeps_active_holds(self):
+        active, expired = self._place(self.spaces[0]), self._place(self.spaces[1])
+        self._expire(expired)
+        self.env['workspace.booking.hold']._cron_sweep(batch_size=1)
+        self.assertTrue(active.exists())
+        self.assertFalse(expired.exists())
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import CoworkingCase
+
+
+@tagged('post_install', '-at_install')
+class TestBookingIcs(CoworkingCase):
+    """Flux iCalendar incrémentaux : tout événement qui quitte un flux y laisse une trace"""
+
+    def _tombstones(self, field_name, record):
+        return self.env['workspace.booking.tombstone'].search([(field_name, '=', record.id)])
+
+    def test_archive_records_tombstones(self):
+        booking = self.book(self.spaces[0], status='completed')
+        booking.flush_recordset()
+        past = fields.Datetime.now() - timedelta(days=400)
+        self.env.cr.execute(
+            "UPDATE workspace_booking SET start_date = %s, end_date = %s WHERE id = %s",
+            [past, past + timedelta(hours=1), booking.id],
+        )
+        self.env['workspace.booking.archive']._cron_archive()
+        self.assertFalse(booking.exists())
+        tombstones = self._tombstones('space_id', self.spaces[0])
+        self.assertEqual(tombstones.mapped('booking_id'), [booking.id])
+        self.assertEqual(tombstones.customer_id, self.customer)
+
+    def test_move_leaves_old_feed(self):
+        """Un déplacement est une suppression pour l'ancien espace, pas pour le client"""
+        booking = self.book(self.spaces[0])
+        Booking = self.env['workspace.booking']
+        since = fields.Datetime.now() - timedelta(hours=1)
+        version = Booking._ics_version('space_id', self.spaces[0].id)
+        booking.space_id = self.spaces[1]
+        self.assertNotEqual(Booking._ics_version('space_id', self.spaces[0].id), version)
+
+        bookings, tombstones = Booking._ics_changes('space_id', self.spaces[0].id, since)
+        self.assertFalse(bookings)
+        self.assertEqual([tombstone['booking_id'] for tombstone in tombstones], [booking.id])
+        bookings, tombstones = Booking._ics_changes('space_id', self.spaces[1].id, since)
+        self.assertEqual((bookings, tombstones), (booking, []))
+        bookings, tombstones = Booking._ics_changes('customer_id', self.customer.id, since)
+        self.assertEqual((bookings, tombstones), (booking, []))
+
+        # De retour dans l'ancien espace : l'événement y est renvoyé, sans suppression
+        booking.space_id = self.spaces[0]
+        bookings, tombstones = Booking._ics_changes('space_id', self.spaces[0].id, since)
+        self.assertEqual((bookings, tombstones), (booking, []))
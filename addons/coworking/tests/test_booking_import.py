@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+
+from .common import CoworkingCase
+
+
+@tagged('post_install', '-at_install')
+class TestBookingImport(CoworkingCase):
+    """Import CSV par lots, avec une erreur par ligne rejetée"""
+
+    def _csv(self, *rows):
+        lines = ['space,customer,booking_type,duration,start_date']
+        lines += [
+            f'{space.name},{self.customer.email},hourly,1,{fields.Datetime.to_string(self.start + timedelta(hours=hours))}'
+            for space, hours in rows
+        ]
+        return io.BytesIO('\n'.join(lines).encode())
+
+    def test_conflicts_reported_per_line(self):
+        self.book(self.spaces[0])
+        imported, errors = self.env['workspace.booking.import']._import_stream(
+            self._csv((self.spaces[0], 0), (self.spaces[1], 0), (self.spaces[0], 2)),
+        )
+        self.assertEqual(imported, 2)
+        self.assertEqual([line for line, _error in errors], [2])
+
+    def test_rejected_chunk_retried_row_by_row(self):
+        """Un conflit qui échappe à la vérification du lot ne rejette que sa ligne"""
+        self.book(self.spaces[0])
+        Booking = type(self.env['workspace.booking'])
+        with patch.object(Booking, '_find_conflicts', lambda self, intervals, exclude_ids=(): ([], [])):
+            imported, errors = self.env['workspace.booking.import']._import_stream(
+                self._csv((self.spaces[1], 0), (self.spaces[0], 0), (self.spaces[1], 2)),
+            )
+        self.assertEqual(imported, 2)
+        self.assertEqual(len(errors), 1)
+        line, error = errors[0]
+        self.assertEqual(line, 3)
+        self.assertIn(self.spaces[0].name, error)
+        self.assertEqual(self.env['workspace.booking'].search_count([('space_id', '=', self.spaces[1].id)]), 2)
+
+    def test_past_bookings_imported(self):
+        """La reprise d'historique accepte les dates passées, pas les dates incohérentes"""
+        past = fields.Datetime.to_string(self.start - timedelta(days=400))
+        stream = io.BytesIO('\n'.join([
+            'space,customer,booking_type,duration,start_date,end_date',
+            f'{self.spaces[0].name},{self.customer.email},hourly,1,{past},',
+            f'{self.spaces[1].name},{self.customer.email},hourly,1,{past},{past}',
+        ]).encode())
+        imported, errors = self.env['workspace.booking.import']._import_stream(stream)
+        self.assertEqual(imported, 1)
+        self.assertEqual(errors, [(3, "End date must be strictly after start date.")])
+        # Hors import, la règle des dates passées s'applique toujours
+        with self.assertRaises(ValidationError):
+            self.book(self.spaces[1], hours=-400 * 24)
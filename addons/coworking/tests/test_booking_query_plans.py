@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo.tests import tagged
+from odoo.tools import SQL
+
+from .common import CoworkingSeedCase
+
+
+@tagged('coworking_plans', '-standard', 'post_install', '-at_install')
+class TestBookingQueryPlans(CoworkingSeedCase):
+    """Les requêtes chaudes sur workspace.booking ne doivent jamais parcourir toute la table
+
+    Le jeu de données est volumineux : ce test tourne hors de la suite standard
+    (--test-tags coworking_plans).
+    """
+
+    def _explain(self, query):
+        self.env.cr.execute(SQL("EXPLAIN %s", query))
+        return "\n".join(row[0] for row in self.env.cr.fetchall())
+
+    def assertNoSeqScan(self, query):
+        plan = self._explain(query)
+        self.assertNotIn('Seq Scan on workspace_booking', plan, plan)
+
+    def test_availability_query(self):
+        start = self.now - timedelta(days=3)
+        self.assertNoSeqScan(SQL("""
+            SELECT b.id
+              FROM workspace_booking b
+             WHERE b.space_id = %s
+               AND b.status IS DISTINCT FROM 'cancelled'
+               AND b.end_date > b.start_date
+               AND tsrange(b.start_date, b.end_date) && tsrange(%s, %s)
+        """, self.spaces[0].id, start, start + timedelta(hours=2)))
+
+    def test_availability_domain(self):
+        start = self.now - timedelta(days=3)
+        query = self.env['workspace.booking']._search([
+            ('space_id', '=', self.spaces[0].id),
+            ('status', 'not in', ['cancelled']),
+            ('start_date', '<', start + timedelta(hours=2)),
+            ('end_date', '>', start),
+        ])
+        self.assertNoSeqScan(query.select())
+
+    def test_calendar_range_query(self):
+        week_start = self.now - timedelta(days=7)
+        query = self.env['workspace.booking']._search([
+            ('start_date', '<=', self.now),
+            ('end_date', '>=', week_start),
+        ])
+        self.assertNoSeqScan(query.select())
+
+    def test_customer_bookings_query(self):
+        query = self.env['workspace.booking']._search([
+            ('customer_id', 'in', self.customers[:1].ids),
+        ])
+        self.assertNoSeqScan(query.select())
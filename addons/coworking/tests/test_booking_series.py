@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+
+from .common import CoworkingCase
+from ..models.workspace_booking_series import MAX_OCCURRENCES
+
+
+@tagged('post_install', '-at_install')
+class TestBookingSeries(CoworkingCase):
+    """Réservations récurrentes générées et resynchronisées depuis leur règle"""
+
+    def _series(self, **vals):
+        return self.env['workspace.booking.series'].create(dict({
+            'space_id': self.spaces[0].id,
+            'customer_id': self.customer.id,
+            'booking_type': 'hourly',
+            'duration_value': 1,
+            'start_date': self.start,
+            'frequency': 'daily',
+            'count': 3,
+        }, **vals))
+
+    def _active(self, series):
+        return series.booking_ids.filtered(lambda booking: booking.status != 'cancelled').sorted('start_date')
+
+    def test_generation(self):
+        series = self._series(frequency='weekly', interval=2, count=3)
+        self.assertEqual(self._active(series).mapped('start_date'),
+                         [self.start + timedelta(weeks=2 * week) for week in range(3)])
+        self.assertEqual(self._active(series).mapped('end_date'),
+                         [self.start + timedelta(weeks=2 * week, hours=1) for week in range(3)])
+
+    def test_until_beyond_limit_rejected(self):
+        """Une date de fin trop lointaine est refusée, pas tronquée en silence"""
+        until = fields.Date.to_date(self.start) + timedelta(days=MAX_OCCURRENCES + 10)
+        with self.assertRaisesRegex(ValidationError, str(MAX_OCCURRENCES)):
+            self._series(end_type='until', until=until)
+        series = self._series(end_type='until', until=fields.Date.to_date(self.start) + timedelta(days=4))
+        self.assertEqual(len(series.booking_ids), 5)
+
+    def test_conflict_creates_nothing(self):
+        taken = self.book(self.spaces[0], hours=24)
+        with self.assertRaisesRegex(ValidationError, fields.Datetime.to_string(taken.start_date)):
+            self._series()
+        self.assertEqual(self.env['workspace.booking'].search([('customer_id', '=', self.customer.id)]), taken)
+
+    def test_sync_cancels_replaced_occurrences(self):
+        """Les occurrences modifiées sont annulées et recréées ; les autres ne bougent pas"""
+        series = self._series()
+        first, second, third = self._active(series)
+        series.count = 4
+        self.assertEqual(self._active(series)[:3], first | second | third)
+
+        series.duration_value = 2
+        self.assertEqual({booking.status for booking in first | second | third}, {'cancelled'})
+        self.assertEqual(self._active(series).mapped('duration_value'), [2] * 4)
+
+        series.count = 2
+        self.assertEqual(len(self._active(series)), 2)
+        self.assertEqual(len(series.booking_ids), 8)
+
+    def test_sync_serves_waitlist_after_rebooking(self):
+        """Seuls les créneaux que la nouvelle règle ne reprend pas vont à la liste d'attente"""
+        series = self._series(count=2)
+        Waitlist = self.env['workspace.waitlist']
+        kept, freed = Waitlist.create([{
+            'space_id': self.spaces[0].id,
+            'customer_id': self.customer.id,
+            'booking_type': 'hourly',
+            'duration_value': 1,
+            'start_date': self.start + timedelta(days=day),
+        } for day in range(2)])
+        series.write({'count': 1, 'duration_value': 2})
+        self.assertEqual(kept.state, 'waiting')
+        self.assertEqual(freed.state, 'promoted')
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from odoo.exceptions import UserError, ValidationError
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestLibraryItems(TransactionCase):
+    """Prêts et retours atomiques d'équipements"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.items = cls.env['library.item'].create([
+            {'name': f'Monitor {i}', 'category': 'monitor', 'total_quantity': 10, 'available_quantity': 10}
+            for i in range(2)
+        ])
+        cls.customer = cls.env['coworking.customer'].create({'name': 'Borrower', 'email': 'borrower@example.com'})
+        cls.user = new_test_user(cls.env, login='library_user', groups='base.group_user')
+
+    def test_checkout_and_return(self):
+        first, second = self.items
+        self.assertEqual(self.env['library.item'].checkout_items({first.id: 3, second.id: 1}),
+                         {first.id: 7, second.id: 9})
+        self.assertEqual(self.env['library.item'].return_items({first.id: 2}), {first.id: 9})
+        self.assertEqual(first.available_quantity, 9)
+        self.assertEqual(first.status, 'available')
+
+    def test_string_keys(self):
+        """Les clés d'un objet JSON-RPC arrivent en texte"""
+        first, second = self.items
+        self.assertEqual(self.env['library.item'].checkout_items({str(first.id): 2, str(second.id): 4}),
+                         {first.id: 8, second.id: 6})
+        self.assertEqual(self.env['library.item'].return_items({str(second.id): 4}), {second.id: 10})
+
+    def test_not_enough_stock_applies_nothing(self):
+        first, second = self.items
+        with self.assertRaises(ValidationError):
+            self.env['library.item'].checkout_items({first.id: 1, second.id: 11})
+        self.assertEqual(self.items.mapped('available_quantity'), [10, 10])
+
+    def test_non_positive_quantities_rejected(self):
+        """Une quantité négative inverserait le mouvement et contournerait le contrôle de stock"""
+        first, second = self.items
+        for quantities in ({first.id: 1, second.id: -2}, {first.id: 0}, {str(first.id): '-1'}):
+            with self.assertRaises(UserError):
+                self.env['library.item'].checkout_items(quantities)
+            with self.assertRaises(UserError):
+                self.env['library.item'].return_items(quantities)
+        with self.assertRaises(UserError):
+            self.env['library.item']._move_quantities({first.id: 3}, 'checkout')
+        self.assertEqual(self.items.mapped('available_quantity'), [10, 10])
+        self.assertFalse(self.items.move_ids.filtered(lambda move: move.move_type != 'adjustment'))
+
+    def test_user_ledger_moves(self):
+        """Le registre est en lecture seule, mais un utilisateur crée et ajuste des articles"""
+        Item = self.env['library.item'].with_user(self.user)
+        item = Item.create({'name': 'Keyboard', 'category': 'keyboard', 'total_quantity': 5, 'available_quantity': 5})
+        item.available_quantity = 3
+        item.checkout_items({item.id: 1})
+        item.invalidate_recordset(['move_ids'])
+        self.assertEqual(item.move_ids.mapped('delta'), [-1, -2, 5])
+        self.assertEqual(item.move_ids.mapped('balance'), [2, 3, 5])
+
+    def test_lending_wizard_feeds_report(self):
+        item = self.items[0].with_user(self.user)
+        for action, quantity in ((item.action_checkout(), 3), (item.action_return(), 1)):
+            wizard = self.env['library.item.lending'].with_user(self.user).with_context(action['context']).create({
+                'customer_id': self.customer.id,
+                'quantity': quantity,
+            })
+            wizard.action_confirm()
+        self.assertEqual(self.items[0].available_quantity, 8)
+        report = self.env['library.lending.report'].search([
+            ('customer_id', '=', self.customer.id), ('item_id', '=', self.items[0].id),
+        ])
+        self.assertEqual((report.lent_quantity, report.returned_quantity, report.outstanding_quantity), (3, 1, 2))
+        # La catégorie est une colonne de la vue : regroupable dans le tableau croisé
+        self.assertEqual(self.env['library.lending.report']._read_group(
+            [('customer_id', '=', self.customer.id)], ['category'], ['outstanding_quantity:sum'],
+        ), [('monitor', 2)])
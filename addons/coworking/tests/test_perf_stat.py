@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+from ..models import coworking_perf_stat
+
+
+@tagged('post_install', '-at_install')
+class TestPerfStat(TransactionCase):
+    """Tampon des mesures d'instrumentation"""
+
+    def test_idle_buffer_flushed_by_timer(self):
+        """Une dernière mesure avant l'échéance part en base sans attendre d'autre appel"""
+        written = threading.Event()
+        flushed = []
+
+        def write_pending(registry, pending):
+            flushed.append(pending)
+            written.set()
+
+        with patch.object(coworking_perf_stat, 'FLUSH_INTERVAL', 0.1), \
+                patch.object(coworking_perf_stat, '_write_pending', write_pending):
+            coworking_perf_stat._last_flush[0] = time.monotonic()
+            self.env['coworking.perf.stat']._record('workspace.booking', 'create', 2, 5, 0.01)
+            self.assertFalse(flushed)
+            self.assertTrue(written.wait(5))
+        self.assertEqual(flushed[0][('workspace.booking', 'create')], [1, 2, 5, 0.01, 0.01])
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from odoo.tests import tagged
+
+from .common import CoworkingSeedCase
+from ..models.workspace_bookings import FEED_FIELDS
+
+# Volume de réservations : COWORKING_PERF_VOLUME=1000 | 10000 | 100000
+PERF_VOLUME = int(os.environ.get('COWORKING_PERF_VOLUME', 1000))
+# Fichier de résultats, à comparer d'une version à l'autre : écrit seulement si demandé
+PERF_OUTPUT = os.environ.get('COWORKING_PERF_OUTPUT')
+# Taille des lots créés ou modifiés par chaque mesure
+BATCH = 100
+
+
+@tagged('coworking_perf', '-standard', 'post_install', '-at_install')
+class TestCoworkingPerformance(CoworkingSeedCase):
+    """Temps et nombre de requêtes des opérations chaudes, quel que soit le volume
+
+    Les bornes de assertQueryCount ne dépendent ni de BATCH ni du volume seedé :
+    une régression N+1 les fait échouer. Les mesures sont écrites en JSON dans
+    COWORKING_PERF_OUTPUT. Hors de la suite standard : --test-tags coworking_perf.
+    """
+
+    BOOKINGS = PERF_VOLUME
+    CUSTOMERS = max(PERF_VOLUME // 50, 20)
+    SPACES = max(PERF_VOLUME // 500, 10)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = {}
+        cls.future = cls.now + timedelta(days=30)
+        cls.items = cls.env['library.item'].create([
+            {'name': f'Monitor {i}', 'category': 'monitor', 'total_quantity': 10, 'available_quantity': 10}
+            for i in range(BATCH)
+        ])
+
+    @classmethod
+    def tearDownClass(cls):
+        if PERF_OUTPUT:
+            report = {
+                'volume': PERF_VOLUME,
+                'version': cls.env.ref('base.module_coworking').latest_version,
+                'results': cls.results,
+            }
+            with open(PERF_OUTPUT, 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+        super().tearDownClass()
+
+    @contextmanager
+    def measure(self, name, max_queries):
+        """Chronomètre le bloc, compte ses requêtes et borne ce nombre"""
+        self.env.flush_all()
+        queries_before = self.cr.sql_log_count
+        started = time.perf_counter()
+        with self.assertQueryCount(max_queries):
+            yield
+            self.env.flush_all()
+        self.results[name] = {
+            'seconds': round(time.perf_counter() - started, 4),
+            'queries': self.cr.sql_log_count - queries_before,
+        }
+
+    def _future_vals(self, count, offset_hours=0):
+        return [{
+            'space_id': self.spaces[i % len(self.spaces)].id,
+            'customer_id': self.customers[i % len(self.customers)].id,
+            'booking_type': 'hourly',
+            'duration_value': 1,
+            'start_date': self.future + timedelta(hours=offset_hours + 2 * (i // len(self.spaces))),
+        } for i in range(count)]
+
+    def test_booking_create(self):
+        vals_list = self._future_vals(BATCH)
+        with self.measure('booking_create', 40):
+            self.env['workspace.booking'].create(vals_list)
+
+    def test_booking_write(self):
+        bookings = self.env['workspace.booking'].create(self._future_vals(BATCH))
+        with self.measure('booking_write', 30):
+            bookings.write({'duration_value': 1.5})
+
+    def test_check_availability(self):
+        vals_list = self._future_vals(BATCH)
+        with self.measure('check_availability', 3):
+            self.env['workspace.booking']._check_availability_batch(vals_list)
+
+    def test_compute_total_price(self):
+        bookings = self.env['workspace.booking'].search([], limit=BATCH * 10)
+        bookings.invalidate_recordset()
+        with self.measure('compute_total_price', 5):
+            self.env.add_to_compute(bookings._fields['total_price'], bookings)
+
+    def test_customer_list_read(self):
+        with self.measure('customer_list_read', 3):
+            self.env['coworking.customer'].search_read(
+                [], ['name', 'email', 'phone', 'company', 'booking_count', 'total_spent'], limit=80,
+            )
+
+    def test_calendar_range_read(self):
+        with self.measure('calendar_range_read', 5):
+            self.env['workspace.booking'].search_read([
+                ('start_date', '<=', self.now),
+                ('end_date', '>=', self.now - timedelta(days=7)),
+            ], FEED_FIELDS)
+
+    def test_library_status_recompute(self):
+        with self.measure('library_status_recompute', 5):
+            self.items.write({'available_quantity': 3})
+        with self.measure('library_checkout_batch', 3):
+            self.env['library.item'].checkout_items({item.id: 1 for item in self.items})
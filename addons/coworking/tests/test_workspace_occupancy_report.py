@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import tagged
+
+from .common import CoworkingCase
+
+
+@tagged('post_install', '-at_install')
+class TestWorkspaceOccupancyReport(CoworkingCase):
+    """Rapport d'occupation rafraîchi à partir du journal des jours modifiés"""
+
+    def _dirty_days(self):
+        self.env.cr.execute("SELECT day FROM workspace_occupancy_report_dirty WHERE day = %s", [self.start.date()])
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def test_dirty_log_is_append_only(self):
+        """Chaque réservation ajoute sa marque ; le cron les fusionne en un seul recalcul"""
+        Report = self.env['workspace.occupancy.report']
+        Report._cron_refresh()
+        self.start = self.start.replace(hour=8)
+        self.book(self.spaces[0], status='confirmed')
+        self.book(self.spaces[0], hours=2, duration=2, status='confirmed')
+        self.assertEqual(self._dirty_days(), [self.start.date()] * 2)
+
+        Report._cron_refresh()
+        self.assertFalse(self._dirty_days())
+        row = Report.search([('day', '=', self.start.date()), ('space_id', '=', self.spaces[0].id)])
+        self.assertEqual((row.booking_count, row.booked_hours, row.revenue), (2, 3, 30))
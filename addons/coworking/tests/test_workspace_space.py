@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo.tests import tagged
+
+from .common import CoworkingCase
+
+
+@tagged('post_install', '-at_install')
+class TestWorkspaceSpace(CoworkingCase):
+    """Recherche d'espaces : filtres d'équipements indexés et disponibilités tarifées"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.wifi, cls.projector, cls.whiteboard = cls.env['workspace.amenity'].create([
+            {'name': 'Wifi'}, {'name': 'Projector'}, {'name': 'Whiteboard'},
+        ])
+        cls.spaces[0].amenity_ids = cls.wifi | cls.projector
+        cls.spaces[1].amenity_ids = cls.wifi
+
+    def _search(self, domain):
+        return self.env['workspace.space'].search(domain + [('id', 'in', self.spaces.ids)])
+
+    def test_all_and_any_of(self):
+        amenities = (self.wifi | self.projector).ids
+        self.assertEqual(self._search([('has_all_amenity_ids', 'in', amenities)]), self.spaces[0])
+        self.assertEqual(self._search([('has_any_amenity_ids', 'in', amenities)]), self.spaces)
+        self.assertEqual(self._search([('has_any_amenity_ids', '=', self.projector.id)]), self.spaces[0])
+
+    def test_empty_value_matches_nothing(self):
+        for field_name in ('has_all_amenity_ids', 'has_any_amenity_ids'):
+            for operator, value in (('=', False), ('in', []), ('in', False)):
+                self.assertFalse(self._search([(field_name, operator, value)]))
+
+    def test_free_text(self):
+        """Le texte saisi dans la barre de recherche désigne les équipements par leur nom"""
+        self.assertEqual(self._search([('has_any_amenity_ids', 'ilike', 'proj')]), self.spaces[0])
+        self.assertEqual(self._search([('has_all_amenity_ids', 'ilike', 'wifi')]), self.spaces)
+        self.assertFalse(self._search([('has_any_amenity_ids', 'ilike', 'whiteboard')]))
+        self.assertFalse(self._search([('has_any_amenity_ids', 'ilike', 'sauna')]))
+
+    def test_search_available_prices_bookable_durations(self):
+        """Un tarif mensuel bradé ne fait pas passer un espace devant pour une heure"""
+        monthly_deal = self.env['workspace.space'].create({
+            'name': 'Monthly Deal', 'space_type_id': self.space_type.id, 'capacity': 4,
+            'hourly_rate': 20, 'daily_rate': 100, 'monthly_rate': 200,
+        })
+        spaces = self.spaces | monthly_deal
+
+        def ranking(hours):
+            results = self.env['workspace.space'].search_available(self.start, self.start + timedelta(hours=hours))
+            return [(result['id'], result['price']) for result in results if result['id'] in spaces.ids]
+
+        self.assertEqual(ranking(1), [(self.spaces[0].id, 10), (self.spaces[1].id, 10), (monthly_deal.id, 20)])
+        self.assertEqual(ranking(24), [(self.spaces[0].id, 60), (self.spaces[1].id, 60), (monthly_deal.id, 100)])
+        # Deux mois : au-delà du tarif horaire, le mensuel l'emporte
+        self.book(self.spaces[1], hours=2)
+        self.assertEqual(ranking(24 * 60), [(monthly_deal.id, 400), (self.spaces[0].id, 2400)])
+
+    def _run_list_action(self, xmlid, spaces):
+        action = self.env.ref(xmlid).with_context(active_model='workspace.space', active_ids=spaces.ids)
+        return action.run()['params']['message']
+
+    def test_reprice_selected_spaces(self):
+        """Les actions de la vue liste portent sur tous les espaces sélectionnés"""
+        bookings = self.book(self.spaces[0]) | self.book(self.spaces[1], duration=2)
+        untouched = self.env['workspace.space'].create({
+            'name': 'Unselected', 'space_type_id': self.space_type.id, 'capacity': 4, 'hourly_rate': 10,
+        })
+        other = self.book(untouched)
+        (self.spaces | untouched).hourly_rate = 15
+
+        message = self._run_list_action('coworking.action_workspace_space_preview_reprice', self.spaces)
+        self.assertEqual(message, "2 booking(s), total change +15.00")
+        self.assertEqual(bookings.mapped('total_price'), [10, 20])
+
+        message = self._run_list_action('coworking.action_workspace_space_reprice_bookings', self.spaces)
+        self.assertEqual(message, "2 booking(s), total change +15.00")
+        self.assertEqual(bookings.mapped('total_price'), [15, 30])
+        self.assertEqual(other.total_price, 10)
+        self.assertEqual(self.spaces._reprice_bookings(dry_run=True), {'count': 0, 'delta': 0})
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+
+from .common import CoworkingCase
+
+
+@tagged('post_install', '-at_install')
+class TestWorkspaceWaitlist(CoworkingCase):
+    """Promotion de la liste d'attente à la libération d'un créneau"""
+
+    def _wait(self, space, hours=0, duration=1, priority=0):
+        return self.env['workspace.waitlist'].create({
+            'space_id': space.id,
+            'customer_id': self.customer.id,
+            'booking_type': 'hourly',
+            'duration_value': duration,
+            'start_date': self.start + timedelta(hours=hours),
+            'priority': priority,
+        })
+
+    def test_cancel_promotes_by_priority(self):
+        booking = self.book(self.spaces[0], duration=2)
+        low = self._wait(self.spaces[0], hours=1)
+        high = self._wait(self.spaces[0], hours=0, duration=2, priority=5)
+        booking.status = 'cancelled'
+        self.assertEqual(high.state, 'promoted')
+        self.assertEqual(high.booking_id.status, 'pending')
+        self.assertEqual(low.state, 'waiting')
+
+    def test_conflicting_promotion_keeps_cancellation(self):
+        """Un créneau pris par une transaction concurrente laisse la demande en attente"""
+        booking = self.book(self.spaces[0], duration=2)
+        entry = self._wait(self.spaces[0], hours=1)
+        Booking = type(self.env['workspace.booking'])
+        create = Booking.create
+
+        def create_or_conflict(records, vals_list):
+            if records.env.context.get('skip_availability_batch'):
+                raise ValidationError(" This space is already booked for this period.")
+            return create(records, vals_list)
+
+        with patch.object(Booking, 'create', create_or_conflict):
+            booking.status = 'cancelled'
+        self.assertEqual(booking.status, 'cancelled')
+        self.assertEqual(entry.state, 'waiting')
+        self.assertFalse(entry.booking_id)
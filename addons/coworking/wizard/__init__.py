@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from . import workspace_booking_import
+from . import coworking_export
+from . import library_item_lending
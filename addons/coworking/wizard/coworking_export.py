@@ -0,0 +1,194 @@
+import csv
+import io
+import tempfile
+import uuid
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import xlsxwriter
+
+from odoo import models, fields, api
+
+# Lignes lues par aller-retour sur le curseur serveur, et écrites par morceau HTTP
+EXPORT_CHUNK_ROWS = 2000
+STREAM_CHUNK_BYTES = 64 * 1024
+# Limite d'Excel, en-tête compris : au-delà, la suite part sur une nouvelle feuille
+XLSX_MAX_ROWS = 1048576
+
+BOOKING_HEADERS = [
+    'ID', 'Name', 'Space', 'Space Type', 'Customer', 'Booking Type', 'Duration',
+    'Start Date', 'End Date', 'Total Price', 'Status', 'Archived',
+]
+LIBRARY_HEADERS = [
+    'ID', 'Name', 'Category', 'Condition', 'Total Quantity', 'Available Quantity', 'Status', 'Last Movement',
+]
+STATUSES = [
+    ('pending', 'Pending'),
+    ('confirmed', 'Confirmed'),
+    ('cancelled', 'Cancelled'),
+    ('completed', 'Completed'),
+]
+
+
+class CoworkingExport(models.TransientModel):
+    _name = 'coworking.export'
+    _description = 'Coworking Streaming Export'
+
+    kind = fields.Selection([
+        ('bookings', 'Bookings'),
+        ('library', 'Library Inventory'),
+    ], string='Export', required=True, default='bookings')
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel (XLSX)'),
+    ], string='Format', required=True, default='csv')
+    date_from = fields.Date(string='From')
+    date_to = fields.Date(string='To')
+    status = fields.Selection(STATUSES, string='Status', help="Leave empty to export every status.")
+    space_type_ids = fields.Many2many('workspace.type', string='Space Types')
+
+    def action_export(self):
+        """Ouvre la route de téléchargement : le fichier est produit pendant l'envoi"""
+        self.ensure_one()
+        params = {key: value for key, value in {
+            'date_from': self.date_from and fields.Date.to_string(self.date_from),
+            'date_to': self.date_to and fields.Date.to_string(self.date_to),
+            'status': self.status,
+            'space_type_ids': ','.join(map(str, self.space_type_ids.ids)),
+        }.items() if value}
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f"/coworking/export/{self.kind}.{self.file_format}?{urlencode(params)}",
+            'target': 'self',
+        }
+
+    @api.model
+    def _server_cursor(self, query, params):
+        """Parcourt le résultat par paquets via un curseur nommé (côté serveur)
+
+        Seul le paquet courant réside en mémoire, quel que soit le nombre de lignes.
+        """
+        with self.env.cr._cnx.cursor(f'coworking_export_{uuid.uuid4().hex}') as rows:
+            rows.itersize = EXPORT_CHUNK_ROWS
+            rows.execute(query, params)
+            yield from rows
+
+    @api.model
+    def _booking_rows(self, date_from=None, date_to=None, statuses=(), space_type_ids=()):
+        """Réservations filtrées, archive comprise, avec les noms résolus en mémoire
+
+        Espaces, types et clients sont chargés une fois dans des dictionnaires : la
+        requête principale ne fait aucune jointure, et le tri par date fusionne les
+        parcours d'index des deux tables sans trier le million de lignes.
+        """
+        cr = self.env.cr
+        cr.execute("""
+            SELECT s.id, s.name, t.name, s.space_type_id
+              FROM workspace_space s
+              LEFT JOIN workspace_type t ON t.id = s.space_type_id
+        """)
+        spaces = {space_id: (name, type_name, type_id) for space_id, name, type_name, type_id in cr.fetchall()}
+        cr.execute("SELECT id, name FROM coworking_customer")
+        customers = dict(cr.fetchall())
+
+        conditions, params = ["TRUE"], {}
+        if date_from:
+            conditions.append("start_date >= %(date_from)s")
+            params['date_from'] = date_from
+        if date_to:
+            conditions.append("start_date < %(date_to)s")
+            params['date_to'] = fields.Date.to_date(date_to) + timedelta(days=1)
+        if statuses:
+            conditions.append("status = ANY(%(statuses)s)")
+            params['statuses'] = list(statuses)
+        if space_type_ids:
+            conditions.append("space_id = ANY(%(space_ids)s)")
+            params['space_ids'] = [
+                space_id for space_id, (_name, _type_name, type_id) in spaces.items() if type_id in space_type_ids
+            ]
+        where = ' AND '.join(conditions)
+        query = f"""
+            SELECT id, name, space_id, customer_id, booking_type, duration_value,
+                   start_date, end_date, total_price, status, FALSE
+              FROM workspace_booking
+             WHERE {where}
+             UNION ALL
+            SELECT booking_id, name, space_id, customer_id, booking_type, duration_value,
+                   start_date, end_date, total_price, status, TRUE
+              FROM workspace_booking_archive
+             WHERE {where}
+             ORDER BY 7, 1
+        """
+        for (booking_id, name, space_id, customer_id, booking_type, duration, start, end,
+             price, status, archived) in self._server_cursor(query, params):
+            space_name, type_name, _type_id = spaces.get(space_id, ('', '', None))
+            yield (
+                booking_id, name, space_name, type_name, customers.get(customer_id, ''), booking_type,
+                duration, start, end, price, status, archived,
+            )
+
+    @api.model
+    def _library_rows(self, statuses=()):
+        """Inventaire des équipements avec la date de leur dernier mouvement"""
+        conditions, params = ["TRUE"], {}
+        if statuses:
+            conditions.append("i.status = ANY(%(statuses)s)")
+            params['statuses'] = list(statuses)
+        query = f"""
+            SELECT i.id, i.name, i.category, i.condition, i.total_quantity, i.available_quantity, i.status,
+                   (SELECT m.date FROM library_item_move m WHERE m.item_id = i.id ORDER BY m.id DESC LIMIT 1)
+              FROM library_item i
+             WHERE {' AND '.join(conditions)}
+             ORDER BY i.name, i.id
+        """
+        return self._server_cursor(query, params)
+
+    @api.model
+    def _rows(self, kind, **filters):
+        if kind == 'library':
+            return LIBRARY_HEADERS, self._library_rows(filters.get('statuses', ()))
+        return BOOKING_HEADERS, self._booking_rows(**filters)
+
+    @api.model
+    def _stream_csv(self, headers, rows):
+        """CSV envoyé par morceaux de EXPORT_CHUNK_ROWS lignes"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(headers)
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if count % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    @api.model
+    def _stream_xlsx(self, headers, rows):
+        """XLSX écrit en mode mémoire constante dans un fichier temporaire, puis envoyé par morceaux
+
+        Le format est une archive zip : il n'existe qu'une fois le classeur fermé,
+        mais chaque ligne est écrite sur disque dès sa production.
+        """
+        with tempfile.TemporaryFile() as output:
+            workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'remove_timezone': True})
+            bold = workbook.add_format({'bold': True})
+            date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm'})
+            sheet, row_index = None, XLSX_MAX_ROWS
+            for row in rows:
+                if row_index == XLSX_MAX_ROWS:
+                    sheet = workbook.add_worksheet()
+                    sheet.write_row(0, 0, headers, bold)
+                    row_index = 1
+                for column, value in enumerate(row):
+                    if hasattr(value, 'strftime'):
+                        sheet.write_datetime(row_index, column, value, date_format)
+                    elif value is not None:
+                        sheet.write(row_index, column, value)
+                row_index += 1
+            if sheet is None:
+                workbook.add_worksheet().write_row(0, 0, headers, bold)
+            workbook.close()
+            output.seek(0)
+            while chunk := output.read(STREAM_CHUNK_BYTES):
+                yield chunk
@@ -0,0 +1,40 @@
+from odoo import models, fields
+from odoo.exceptions import ValidationError
+
+
+class LibraryItemLending(models.TransientModel):
+    _name = 'library.item.lending'
+    _description = 'Library Item Checkout / Return'
+
+    item_id = fields.Many2one('library.item', string='Item', required=True, readonly=True, ondelete='cascade')
+    move_type = fields.Selection([
+        ('checkout', 'Checkout'),
+        ('return', 'Return'),
+    ], string='Type', required=True, readonly=True)
+    customer_id = fields.Many2one('coworking.customer', string='Customer', required=True)
+    quantity = fields.Integer(string='Quantity', default=1, required=True)
+
+    def action_confirm(self):
+        """Prête ou retourne les exemplaires au nom du client, pour le rapport des prêts"""
+        self.ensure_one()
+        if self.quantity <= 0:
+            raise ValidationError(" Quantity must be greater than 0.")
+        item = self.item_id
+        if self.move_type == 'checkout':
+            available = item.checkout_items({item.id: self.quantity}, self.customer_id.id)[item.id]
+            title, message, kind = 'Emprunt', f"{item.name} prêté à {self.customer_id.name}, {available} restant(s)", 'success'
+        else:
+            available = item.return_items({item.id: self.quantity}, self.customer_id.id)[item.id]
+            title, message, kind = 'Retour', f"{item.name} retourné, {available} disponible(s)", 'info'
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': title,
+                'message': message,
+                'sticky': False,
+                'type': kind,
+                # Ferme l'assistant : le formulaire de l'équipement est rechargé
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
@@ -0,0 +1,205 @@
+import base64
+import csv
+import io
+import logging
+import threading
+from itertools import islice
+
+from psycopg2 import IntegrityError
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError, ValidationError
+
+from ..models.workspace_bookings import booking_dates_error, booking_duration_error, booking_end_date
+
+_logger = logging.getLogger(__name__)
+
+BOOKING_TYPES = ('hourly', 'daily', 'monthly')
+STATUSES = ('pending', 'confirmed', 'cancelled', 'completed')
+
+
+class WorkspaceBookingImport(models.TransientModel):
+    _name = 'workspace.booking.import'
+    _description = 'Workspace Booking Import'
+
+    file = fields.Binary(string='CSV File', required=True)
+    filename = fields.Char(string='File Name')
+    chunk_size = fields.Integer(string='Chunk Size', default=1000, required=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('done', 'Done'),
+    ], string='State', default='draft')
+    imported_count = fields.Integer(string='Imported', readonly=True)
+    error_count = fields.Integer(string='Errors', readonly=True)
+    error_file = fields.Binary(string='Error Report', readonly=True)
+    error_filename = fields.Char(string='Error Report Name', readonly=True)
+
+    @api.model
+    def _lookup_maps(self):
+        """Charge une fois les correspondances nom -> id des espaces et clients"""
+        spaces = {
+            space['name'].strip().lower(): space['id']
+            for space in self.env['workspace.space'].search_read([], ['name'])
+        }
+        customers = {}
+        for customer in self.env['coworking.customer'].with_context(active_test=False).search_read([], ['name', 'email']):
+            customers.setdefault(customer['name'].strip().lower(), customer['id'])
+            if customer['email']:
+                customers[customer['email'].strip().lower()] = customer['id']
+        return spaces, customers
+
+    @api.model
+    def _row_to_vals(self, row, spaces, customers):
+        """Convertit une ligne CSV en valeurs de création, ou renvoie l'erreur"""
+        space_name = (row.get('space') or '').strip()
+        space_id = spaces.get(space_name.lower())
+        if not space_id:
+            return None, f"Unknown space '{space_name}'."
+        customer_key = (row.get('customer') or '').strip()
+        customer_id = customers.get(customer_key.lower())
+        if not customer_id:
+            return None, f"Unknown customer '{customer_key}'."
+        booking_type = (row.get('booking_type') or '').strip().lower()
+        if booking_type not in BOOKING_TYPES:
+            return None, f"Invalid booking type '{booking_type}'."
+        status = (row.get('status') or 'pending').strip().lower()
+        if status not in STATUSES:
+            return None, f"Invalid status '{status}'."
+        try:
+            duration_value = float(row.get('duration') or 1.0)
+            start_date = fields.Datetime.to_datetime((row.get('start_date') or '').strip())
+            end_date = fields.Datetime.to_datetime((row.get('end_date') or '').strip() or False)
+        except ValueError as e:
+            return None, f"Invalid value: {e}"
+        if not start_date:
+            return None, "Missing start date."
+        end_date = end_date or booking_end_date(booking_type, start_date, duration_value)
+        error = booking_duration_error(booking_type, duration_value) or booking_dates_error(
+            start_date, end_date, allow_past=True,
+        )
+        if error:
+            return None, error.strip()
+        return {
+            'space_id': space_id,
+            'customer_id': customer_id,
+            'booking_type': booking_type,
+            'duration_value': duration_value,
+            'start_date': start_date,
+            'end_date': end_date,
+            'status': status,
+            'notes': row.get('notes') or False,
+        }, None
+
+    @api.model
+    def _import_chunk(self, rows, spaces, customers):
+        """Valide et crée un lot de lignes (numéro de ligne, dict)
+
+        Les contrôles de dates et de durée se font en mémoire, les chevauchements
+        en une requête pour tout le lot, puis les lignes valides sont créées en un
+        seul appel. Si ce lot échoue, chaque ligne est recréée sous son propre
+        savepoint pour retrouver la cause ligne par ligne. Renvoie (nombre créé,
+        [(ligne, erreur)]).
+        """
+        # L'historique passé est importable : seule la cohérence des dates est contrôlée
+        Booking = self.env['workspace.booking'].with_context(booking_import=True)
+        errors = []
+        vals_list, lines = [], []
+        for line, row in rows:
+            vals, error = self._row_to_vals(row, spaces, customers)
+            if error:
+                errors.append((line, error))
+            else:
+                vals_list.append(vals)
+                lines.append(line)
+
+        rejected = {}
+        existing_conflicts, batch_conflicts = Booking._find_conflicts(Booking._intervals_from_vals(vals_list))
+        for index, booking_id in existing_conflicts:
+            rejected.setdefault(index, f"Space already booked for this period (booking #{booking_id})."
+                                if booking_id else "Space temporarily held for this period.")
+        for first, second in batch_conflicts:
+            if first not in rejected:
+                rejected.setdefault(second, f"Overlaps line {lines[first]} of the same file.")
+        errors.extend((lines[index], message) for index, message in rejected.items())
+        valid = [vals for index, vals in enumerate(vals_list) if index not in rejected]
+        if not valid:
+            return 0, errors
+
+        try:
+            with self.env.cr.savepoint():
+                Booking.with_context(skip_availability_batch=True).create(valid)
+            return len(valid), errors
+        except (ValidationError, IntegrityError):
+            # Un conflit concurrent ou une contrainte rejette le lot : reprise ligne à ligne
+            _logger.info("Booking import: chunk rejected, retrying %s row(s) one by one", len(valid))
+        imported = 0
+        for index, vals in enumerate(vals_list):
+            if index in rejected:
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    Booking.create(vals)
+                imported += 1
+            except (ValidationError, IntegrityError) as e:
+                errors.append((lines[index], str(e).strip()))
+        return imported, errors
+
+    @api.model
+    def _import_stream(self, stream, chunk_size=1000, commit=False):
+        """Importe un flux CSV binaire par lots de chunk_size lignes
+
+        La mémoire reste constante : seules les lignes du lot courant sont
+        conservées, et le cache ORM est vidé après chaque lot. Avec commit=True,
+        chaque lot fait l'objet de sa propre transaction.
+        """
+        spaces, customers = self._lookup_maps()
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        numbered = ((reader.line_num, row) for row in reader)
+        imported, errors = 0, []
+        while True:
+            rows = list(islice(numbered, chunk_size))
+            if not rows:
+                break
+            chunk_imported, chunk_errors = self._import_chunk(rows, spaces, customers)
+            imported += chunk_imported
+            errors += chunk_errors
+            if commit:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+            _logger.info("Booking import: %s row(s) imported, %s error(s) so far", imported, len(errors))
+        return imported, sorted(errors)
+
+    def action_import(self):
+        self.ensure_one()
+        if self.chunk_size <= 0:
+            raise UserError("Chunk size must be greater than 0.")
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', 'file'),
+        ], limit=1)
+        # Lecture directe depuis le filestore, sans décoder tout le fichier en mémoire
+        if attachment.store_fname:
+            stream = open(attachment._full_path(attachment.store_fname), 'rb')
+        else:
+            stream = io.BytesIO(attachment.raw or b'')
+        commit = not getattr(threading.current_thread(), 'testing', False)
+        with stream:
+            imported, errors = self._import_stream(stream, self.chunk_size, commit=commit)
+
+        values = {'state': 'done', 'imported_count': imported, 'error_count': len(errors)}
+        if errors:
+            report = io.StringIO()
+            writer = csv.writer(report)
+            writer.writerow(['line', 'error'])
+            writer.writerows(errors)
+            values['error_file'] = base64.b64encode(report.getvalue().encode())
+            values['error_filename'] = 'booking_import_errors.csv'
+        self.write(values)
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
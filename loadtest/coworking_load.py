@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Banc de charge JSON-RPC du module coworking, contre la pile docker-compose locale
+
+Bibliothèque standard uniquement : aucun accès réseau hors de l'instance visée.
+
+    docker compose up -d
+    python3 loadtest/coworking_load.py --db coworking --clients 16 --duration 60 \\
+        --spaces 50 --customers 500 --items 100 --output load.json
+
+Chaque client est un thread avec sa propre connexion HTTP persistante. Il tire au
+sort des opérations selon --mix (création de réservation, recherche de disponibilité,
+confirmation / annulation, lecture de plage calendrier, prêt et retour d'équipement).
+Le rapport JSON donne, par opération et au total : débit, latences p50/p95/p99,
+taux de conflits (refus métier attendus : créneau déjà pris, stock épuisé) et
+taux d'erreurs. Le code de sortie vaut 1 si le taux d'erreurs dépasse --max-error-rate,
+ou si --baseline (rapport d'un passage précédent) montre une baisse de débit supérieure
+à --max-regression sur une opération.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+DEFAULT_MIX = 'create_booking=30,search_available=25,confirm_or_cancel=15,calendar_range=20,library_checkout=10'
+# Préfixe des données générées, pour les retrouver et les supprimer
+PREFIX = 'LOADTEST'
+FEED_FIELDS = ['name', 'space_id', 'customer_id', 'status', 'start_date', 'end_date']
+# Exceptions métier attendues sous contention : comptées comme conflits, pas comme erreurs
+CONFLICT_EXCEPTIONS = ('odoo.exceptions.ValidationError', 'odoo.exceptions.UserError')
+
+
+class RpcError(Exception):
+    def __init__(self, error):
+        data = error.get('data') or {}
+        super().__init__(data.get('message') or error.get('message'))
+        self.name = data.get('name', '')
+
+    @property
+    def conflict(self):
+        return self.name in CONFLICT_EXCEPTIONS
+
+
+class Client:
+    """Connexion JSON-RPC persistante (un client par thread)"""
+
+    _ids = itertools.count()
+
+    def __init__(self, url, db, login, password, timeout=60):
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.db, self.login, self.password = db, login, password
+        self.uid = None
+
+    def call(self, service, method, *args):
+        payload = json.dumps({
+            'jsonrpc': '2.0',
+            'method': 'call',
+            'params': {'service': service, 'method': method, 'args': args},
+            'id': next(self._ids),
+        })
+        try:
+            self.connection.request('POST', '/jsonrpc', payload, {'Content-Type': 'application/json'})
+            response = json.loads(self.connection.getresponse().read())
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            raise
+        if response.get('error'):
+            raise RpcError(response['error'])
+        return response['result']
+
+    def authenticate(self):
+        self.uid = self.call('common', 'login', self.db, self.login, self.password)
+        if not self.uid:
+            raise SystemExit(f"Authentication failed for {self.login!r} on database {self.db!r}")
+        return self
+
+    def execute(self, model, method, *args, **kwargs):
+        return self.call('object', 'execute_kw', self.db, self.uid, self.password, model, method, list(args), kwargs)
+
+
+def to_string(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def percentile(sorted_values, ratio):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(ratio * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _sep, weight = part.partition('=')
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"Unknown operation in --mix: {name.strip()!r}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# ---------------------------------------------------------------------------
+# Données
+# ---------------------------------------------------------------------------
+
+def seed(client, args):
+    """Crée (ou réutilise) les espaces, clients et équipements de test"""
+    space_type = client.execute('workspace.type', 'search', [('code', '=', PREFIX)], limit=1)
+    space_type_id = space_type[0] if space_type else client.execute(
+        'workspace.type', 'create', {'name': f'{PREFIX} Room', 'code': PREFIX},
+    )
+
+    def ensure(model, count, make_vals):
+        ids = client.execute(model, 'search', [('name', '=like', f'{PREFIX} %')], order='id')
+        # Les données d'un passage précédent sont réutilisées : seul le complément est créé
+        for start in range(len(ids), count, 500):
+            ids += client.execute(model, 'create', [make_vals(i) for i in range(start, min(start + 500, count))])
+        return ids[:count]
+
+    spaces = ensure('workspace.space', args.spaces, lambda i: {
+        'name': f'{PREFIX} Space {i:05d}', 'space_type_id': space_type_id, 'capacity': 2 + i % 10,
+        'hourly_rate': 10 + i % 5, 'daily_rate': 60, 'monthly_rate': 1200,
+    })
+    customers = ensure('coworking.customer', args.customers, lambda i: {
+        'name': f'{PREFIX} Customer {i:06d}', 'email': f'loadtest{i}@example.com',
+    })
+    items = ensure('library.item', args.items, lambda i: {
+        'name': f'{PREFIX} Item {i:05d}', 'category': 'monitor', 'total_quantity': 20, 'available_quantity': 20,
+    })
+    return {'space_type_id': space_type_id, 'spaces': spaces, 'customers': customers, 'items': items}
+
+
+def cleanup(client, data):
+    """Supprime les réservations, équipements, clients et espaces générés"""
+    bookings = client.execute('workspace.booking', 'search', [('space_id', 'in', data['spaces'])])
+    for start in range(0, len(bookings), 1000):
+        client.execute('workspace.booking', 'unlink', bookings[start:start + 1000])
+    client.execute('library.item', 'unlink', data['items'])
+    client.execute('coworking.customer', 'unlink', data['customers'])
+    client.execute('workspace.space', 'unlink', data['spaces'])
+    client.execute('workspace.type', 'unlink', [data['space_type_id']])
+
+
+# ---------------------------------------------------------------------------
+# Opérations
+# ---------------------------------------------------------------------------
+
+class Session:
+    """État d'un client virtuel : ses réservations et prêts en cours"""
+
+    def __init__(self, client, data, args, rng):
+        self.client, self.data, self.args, self.rng = client, data, args, rng
+        self.bookings = []
+        self.borrowed = []
+        self.origin = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    def random_slot(self):
+        start = self.origin + timedelta(hours=self.rng.randrange(self.args.horizon_days * 24))
+        return start, start + timedelta(hours=self.rng.randint(1, 3))
+
+    def create_booking(self):
+        start, end = self.random_slot()
+        booking_id = self.client.execute('workspace.booking', 'create', {
+            'space_id': self.rng.choice(self.data['spaces']),
+            'customer_id': self.rng.choice(self.data['customers']),
+            'booking_type': 'hourly',
+            'duration_value': (end - start).total_seconds() / 3600,
+            'start_date': to_string(start),
+        })
+        self.bookings.append(booking_id)
+
+    def search_available(self):
+        start, end = self.random_slot()
+        self.client.execute('workspace.space', 'search_available', to_string(start), to_string(end),
+                            capacity=self.rng.randint(1, 6), limit=20)
+
+    def confirm_or_cancel(self):
+        if not self.bookings:
+            return self.create_booking()
+        booking_id = self.bookings.pop(self.rng.randrange(len(self.bookings)))
+        method = 'action_confirm' if self.rng.random() < 0.7 else 'action_cancel'
+        self.client.execute('workspace.booking', method, [booking_id])
+
+    def calendar_range(self):
+        start = self.origin + timedelta(days=self.rng.randrange(self.args.horizon_days))
+        self.client.execute('workspace.booking', 'search_read', [
+            ('space_id', 'in', self.rng.sample(self.data['spaces'], min(5, len(self.data['spaces'])))),
+            ('start_date', '<=', to_string(start + timedelta(days=7))),
+            ('end_date', '>=', to_string(start)),
+        ], fields=FEED_FIELDS)
+
+    def library_checkout(self):
+        if self.borrowed and self.rng.random() < 0.5:
+            item_id, customer_id = self.borrowed.pop(self.rng.randrange(len(self.borrowed)))
+            self.client.execute('library.item', 'return_items', {str(item_id): 1}, customer_id=customer_id)
+            return
+        item_id = self.rng.choice(self.data['items'])
+        customer_id = self.rng.choice(self.data['customers'])
+        self.client.execute('library.item', 'checkout_items', {str(item_id): 1}, customer_id=customer_id)
+        self.borrowed.append((item_id, customer_id))
+
+
+OPERATIONS = ['create_booking', 'search_available', 'confirm_or_cancel', 'calendar_range', 'library_checkout']
+
+
+# ---------------------------------------------------------------------------
+# Exécution
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {name: [] for name in OPERATIONS}
+        self.conflicts = {name: 0 for name in OPERATIONS}
+        self.errors = {name: 0 for name in OPERATIONS}
+        self.error_messages = {}
+
+    def record(self, name, seconds, outcome, message=None):
+        with self.lock:
+            self.samples[name].append(seconds)
+            if outcome == 'conflict':
+                self.conflicts[name] += 1
+            elif outcome == 'error':
+                self.errors[name] += 1
+                key = (message or '')[:200]
+                self.error_messages[key] = self.error_messages.get(key, 0) + 1
+
+    def report(self, elapsed):
+        def summary(samples, conflicts, errors):
+            latencies = sorted(samples)
+            count = len(latencies)
+            return {
+                'count': count,
+                'throughput_per_s': round(count / elapsed, 2) if elapsed else None,
+                'p50_ms': latencies and round(percentile(latencies, 0.50) * 1000, 2),
+                'p95_ms': latencies and round(percentile(latencies, 0.95) * 1000, 2),
+                'p99_ms': latencies and round(percentile(latencies, 0.99) * 1000, 2),
+                'max_ms': latencies and round(latencies[-1] * 1000, 2),
+                'conflicts': conflicts,
+                'conflict_rate': round(conflicts / count, 4) if count else 0,
+                'errors': errors,
+                'error_rate': round(errors / count, 4) if count else 0,
+            }
+
+        operations = {
+            name: summary(self.samples[name], self.conflicts[name], self.errors[name])
+            for name in OPERATIONS if self.samples[name]
+        }
+        total = summary(
+            [seconds for samples in self.samples.values() for seconds in samples],
+            sum(self.conflicts.values()),
+            sum(self.errors.values()),
+        )
+        top_errors = sorted(self.error_messages.items(), key=lambda item: -item[1])[:10]
+        return operations, total, [{'message': message, 'count': count} for message, count in top_errors]
+
+
+def worker(index, args, data, mix, recorder, barrier):
+    rng = random.Random(args.seed * 1000 + index)
+    client = Client(args.url, args.db, args.login, args.password).authenticate()
+    session = Session(client, data, args, rng)
+    names, weights = list(mix), list(mix.values())
+    done = 0
+    barrier.wait()
+    deadline = time.monotonic() + args.duration
+    while time.monotonic() < deadline and (not args.requests or done < args.requests):
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        outcome, message = 'ok', None
+        try:
+            getattr(session, name)()
+        except RpcError as e:
+            outcome, message = ('conflict' if e.conflict else 'error'), str(e)
+        except (http.client.HTTPException, OSError) as e:
+            outcome, message = 'error', f"{type(e).__name__}: {e}"
+        recorder.record(name, time.perf_counter() - started, outcome, message)
+        done += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--login', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--clients', type=int, default=8, help="concurrent virtual clients")
+    parser.add_argument('--duration', type=float, default=30, help="seconds of measured load")
+    parser.add_argument('--requests', type=int, default=0, help="stop each client after N requests (0 = no limit)")
+    parser.add_argument('--spaces', type=int, default=20)
+    parser.add_argument('--customers', type=int, default=200)
+    parser.add_argument('--items', type=int, default=50)
+    parser.add_argument('--horizon-days', type=int, default=30, help="bookings are spread over this many days")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="operation=weight,... (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--cleanup', action='store_true', help="delete generated data afterwards")
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--baseline', help="previous JSON report to compare throughput against")
+    parser.add_argument('--max-regression', type=float, default=0.10,
+                        help="tolerated relative throughput drop per operation (default: %(default)s)")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    admin = Client(args.url, args.db, args.login, args.password).authenticate()
+    seed_started = time.monotonic()
+    data = seed(admin, args)
+    seed_seconds = time.monotonic() - seed_started
+
+    recorder = Recorder()
+    # Le chronomètre ne démarre qu'une fois tous les clients authentifiés
+    barrier = threading.Barrier(args.clients + 1)
+    threads = [
+        threading.Thread(target=worker, args=(index, args, data, mix, recorder, barrier), daemon=True)
+        for index in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.monotonic()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    operations, total, top_errors = recorder.report(elapsed)
+    report = {
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'config': {
+            'url': args.url, 'db': args.db, 'clients': args.clients, 'duration': args.duration,
+            'requests': args.requests, 'spaces': args.spaces, 'customers': args.customers,
+            'items': args.items, 'horizon_days': args.horizon_days, 'mix': mix, 'seed': args.seed,
+        },
+        'seed_seconds': round(seed_seconds, 2),
+        'elapsed_seconds': round(elapsed, 2),
+        'total': total,
+        'operations': operations,
+        'top_errors': top_errors,
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for name, stats in operations.items():
+            before = baseline.get('operations', {}).get(name, {}).get('throughput_per_s')
+            if before and stats['throughput_per_s'] < before * (1 - args.max_regression):
+                regressions.append({'operation': name, 'baseline': before, 'current': stats['throughput_per_s']})
+        report['regressions'] = regressions
+    if args.cleanup:
+        cleanup(admin, data)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 1 if total['error_rate'] > args.max_error_rate or regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())